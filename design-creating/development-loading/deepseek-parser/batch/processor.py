@@ -4,13 +4,16 @@ batch/processor.py
 """
 import os
 import json
+import queue
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple, Union
 from tqdm import tqdm
 import logging
 
-from utils.logger import logger
+from utils.logger import logger, get_logger
 from utils.file_ops import FileOperations
 from core.deepseek_parser import DeepSeekParser
 from core.conversation_builder import ConversationBuilder
@@ -18,6 +21,146 @@ from core.content_formatter import ContentFormatter
 from outputs.optimized_markdown import OptimizedMarkdownWriter
 
 
+# 串行批量处理时后台预读的文件数
+PREFETCH_DEPTH = 4
+
+# 并行批量处理时每个工作进程预先提交的任务数（滑动窗口大小 = 工作进程数 × 该值）
+BATCH_SUBMIT_AHEAD = 2
+
+# 输出目录中记录已处理文件的清单（增量模式据此跳过未变化的文件）
+BATCH_MANIFEST_FILE = '.ds_manifest.json'
+
+
+def _process_file(parser: DeepSeekParser, builder: ConversationBuilder, formatter: ContentFormatter,
+                  writer: OptimizedMarkdownWriter, file_path: str, output_dir: str, overwrite: bool,
+                  dialog_id: Optional[str] = None,
+                  html_content: Optional[Union[str, Exception]] = None) -> Dict[str, Any]:
+    """
+    读取、解析、构建、格式化并写出单个文件，返回处理结果
+    
+    html_content为预读的文件内容（或预读时的异常），为None时在此读取。
+    """
+    result = {
+        'file': file_path,
+        'success': False,
+        'error': None,
+        'processing_time': 0
+    }
+    
+    start_time = time.time()
+    
+    try:
+        # 读取HTML文件
+        if html_content is None:
+            html_content = FileOperations.read_file(file_path)
+        elif isinstance(html_content, Exception):
+            raise html_content
+        
+        if not html_content:
+            result['error'] = '文件内容为空'
+            return result
+        
+        # 解析HTML
+        parsed_data = parser.parse_html(html_content)
+        
+        if not parsed_data.get('rounds'):
+            result['error'] = '未解析到对话轮次'
+            return result
+        
+        # 构建对话（同时格式化内容）
+        conversation = builder.build(parsed_data, dialog_id, formatter=formatter)
+        
+        if not conversation.get('rounds'):
+            result['error'] = '未构建出有效对话'
+            return result
+        
+        # 生成输出文件名
+        base_name = FileOperations.get_output_basename(conversation)
+        
+        if overwrite:
+            output_file = os.path.join(output_dir, f"{base_name}.md")
+            writer.write_to_file(conversation, output_file)
+        else:
+            # 以独占方式创建不重名的文件，并行处理时不会互相覆盖
+            output_file = FileOperations.reserve_unique_file(output_dir, base_name, '.md')
+            try:
+                writer.write_to_file(conversation, output_file)
+            except Exception:
+                os.remove(output_file)
+                raise
+        
+        # 记录结果
+        result['success'] = True
+        result['output_file'] = output_file
+        result['dialog_id'] = conversation.get('dialog_id')
+        result['rounds'] = len(conversation['rounds'])
+        
+    except Exception as e:
+        result['error'] = str(e)
+    
+    finally:
+        # 计算处理时间
+        end_time = time.time()
+        result['processing_time'] = end_time - start_time
+    
+    return result
+
+
+def _prefetch_files(file_paths: List[str]) -> Iterator[Tuple[str, Union[str, Exception]]]:
+    """
+    在后台线程中提前读取文件，按顺序逐个返回 (文件路径, 内容)
+    
+    读取失败时内容为对应的异常；最多预读PREFETCH_DEPTH个文件。
+    """
+    file_queue = queue.Queue(maxsize=PREFETCH_DEPTH)
+    stop_event = threading.Event()
+    
+    def reader():
+        for file_path in file_paths:
+            if stop_event.is_set():
+                return
+            try:
+                content = FileOperations.read_file(file_path)
+            except Exception as e:
+                content = e
+            file_queue.put((file_path, content))
+    
+    threading.Thread(target=reader, daemon=True).start()
+    try:
+        for _ in file_paths:
+            yield file_queue.get()
+    finally:
+        # 提前停止迭代时通知读取线程退出，并腾出队列避免其阻塞在put上
+        stop_event.set()
+        while True:
+            try:
+                file_queue.get_nowait()
+            except queue.Empty:
+                break
+
+
+# 批量处理工作进程中的组件（每个进程创建一次）
+_worker_components = None
+
+
+def _init_batch_worker(config: Dict[str, Any]):
+    """工作进程初始化：重建日志后台线程并创建解析、构建、格式化、输出组件"""
+    global _worker_components
+    get_logger(config)  # fork出的子进程中没有父进程的日志监听线程
+    _worker_components = (
+        DeepSeekParser(config),
+        ConversationBuilder(config),
+        ContentFormatter(config),
+        OptimizedMarkdownWriter(config)
+    )
+
+
+def _process_file_in_worker(file_path: str, output_dir: str, overwrite: bool,
+                            dialog_id: Optional[str]) -> Dict[str, Any]:
+    """在工作进程中处理单个文件"""
+    return _process_file(*_worker_components, file_path, output_dir, overwrite, dialog_id)
+
+
 class BatchProcessor:
     """批量处理多个HTML文件"""
     
@@ -110,12 +253,18 @@ class BatchProcessor:
             'details': []
         }
         
+        # 并行处理时HTML解析在多个进程中进行，构建和写入仍按顺序执行
+        if self.parallel_processing and len(html_files) > 1:
+            parsed_results = self.parser.parse_files(html_files)
+        else:
+            parsed_results = ((file_path, None) for file_path in html_files)
+        
         # 显示进度条
         with tqdm(total=len(html_files), desc="处理HTML文件", unit="文件") as pbar:
-            for file_path in html_files:
+            for file_path, parsed_data in parsed_results:
                 try:
                     # 处理单个文件
-                    file_result = self.process_single_file(file_path, output_dir, verbose)
+                    file_result = self.process_single_file(file_path, output_dir, verbose, parsed_data)
                     
                     if file_result['success']:
                         results['success'] += 1
@@ -183,7 +332,8 @@ class BatchProcessor:
     
     def process_single_file(self, file_path: str, 
                            output_dir: Optional[str] = None,
-                           verbose: bool = False) -> Dict[str, Any]:
+                           verbose: bool = False,
+                           parsed_data: Optional[Any] = None) -> Dict[str, Any]:
         """
         处理单个HTML文件
         
@@ -191,6 +341,7 @@ class BatchProcessor:
             file_path: HTML文件路径
             output_dir: 输出目录路径
             verbose: 是否显示详细信息
+            parsed_data: 并行处理时工作进程返回的解析结果（或异常），为None时在此读取并解析
         
         Returns:
             处理结果
@@ -211,22 +362,26 @@ class BatchProcessor:
             if verbose:
                 self.logger.info(f"处理文件: {file_path}")
             
-            # 1. 读取HTML文件
-            html_content = FileOperations.read_file(file_path)
-            
-            if not html_content:
-                result['error'] = '文件内容为空'
-                return result
-            
-            # 2. 解析HTML
-            parsed_data = self.parser.parse_html(html_content)
+            if parsed_data is None:
+                # 1. 读取HTML文件
+                html_content = FileOperations.read_file(file_path)
+                
+                if not html_content:
+                    result['error'] = '文件内容为空'
+                    return result
+                
+                # 2. 解析HTML
+                parsed_data = self.parser.parse_html(html_content)
+            elif isinstance(parsed_data, Exception):
+                # 工作进程中读取或解析失败
+                raise parsed_data
             
             if not parsed_data.get('rounds'):
                 result['error'] = '未解析到对话轮次'
                 return result
             
-            # 3. 构建对话
-            conversation = self.builder.build(parsed_data)
+            # 3. 构建对话（同时格式化内容）
+            conversation = self.builder.build(parsed_data, formatter=self.formatter)
             
             if not conversation.get('rounds'):
                 result['error'] = '未构建出有效对话'
@@ -236,17 +391,7 @@ class BatchProcessor:
             result['dialog_id'] = dialog_id
             result['total_rounds'] = len(conversation['rounds'])
             
-            # 4. 格式化内容
-            for round_data in conversation['rounds']:
-                # 格式化用户内容
-                user_content = round_data['user']['content']
-                round_data['user']['content'] = self.formatter.format_content(user_content, 'user')
-                
-                # 格式化AI内容
-                ai_content = round_data['ai']['content']
-                round_data['ai']['content'] = self.formatter.format_content(ai_content, 'ai')
-            
-            # 5. 生成输出文件名
+            # 4. 生成输出文件名
             if not output_dir:
                 output_dir = self.output_dir
             
@@ -266,11 +411,10 @@ class BatchProcessor:
                 output_filename = f"{base_name}_{timestamp}{ext}"
                 output_file = os.path.join(output_dir, output_filename)
             
-            # 6. 写入Markdown
-            markdown_content = self.writer.write(conversation)
-            FileOperations.write_file(output_file, markdown_content)
+            # 5. 写入Markdown
+            self.writer.write_to_file(conversation, output_file)
             
-            # 7. 记录结果
+            # 6. 记录结果
             result['success'] = True
             result['output_file'] = output_file
             
@@ -289,6 +433,95 @@ class BatchProcessor:
         
         return result
     
+    def iter_results(self, html_files: List[str], output_dir: str, overwrite: bool,
+                     workers: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        逐个返回 (文件路径, 处理结果)
+        
+        workers为工作进程数（默认取 batch.workers，0为CPU核数）；多于1个时
+        使用多进程并行处理，按完成顺序返回，否则串行处理并按输入顺序返回。
+        """
+        workers = workers or self.config.get('batch', {}).get('workers') or os.cpu_count() or 1
+        if workers <= 1 or len(html_files) <= 1:
+            # 串行处理：后台线程预读后续文件，读盘与解析重叠进行
+            # 整批共用同一个写入器
+            for file_path, html_content in _prefetch_files(html_files):
+                yield file_path, _process_file(self.parser, self.builder, self.formatter, self.writer,
+                                               file_path, output_dir, overwrite, html_content=html_content)
+            return
+        
+        executor = ProcessPoolExecutor(
+            max_workers=min(workers, len(html_files)),
+            initializer=_init_batch_worker,
+            initargs=(self.config,)
+        )
+        try:
+            # 滑动窗口：同时在途的任务不超过 工作进程数×BATCH_SUBMIT_AHEAD，
+            # 每完成一个再提交下一个，大批量时不会一次创建全部任务
+            window = min(workers, len(html_files)) * BATCH_SUBMIT_AHEAD
+            pending_paths = iter(html_files)
+            futures = {}
+            
+            def submit_next():
+                file_path = next(pending_paths, None)
+                if file_path is not None:
+                    # 对话ID由主进程按文件顺序预先分配，避免各工作进程的计数器重复编号
+                    future = executor.submit(_process_file_in_worker, file_path, output_dir, overwrite,
+                                             self.builder._generate_dialog_id())
+                    futures[future] = file_path
+            
+            for _ in range(window):
+                submit_next()
+            
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path = futures.pop(future)
+                    submit_next()
+                    try:
+                        file_result = future.result()
+                    except Exception as e:
+                        # 工作进程异常退出等情况
+                        file_result = {
+                            'file': file_path,
+                            'success': False,
+                            'error': str(e),
+                            'processing_time': 0
+                        }
+                    yield file_path, file_result
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    @staticmethod
+    def load_manifest(output_dir: str) -> Dict[str, List[Any]]:
+        """读取处理清单：{输入文件绝对路径: [修改时间(ns), 大小, 输出文件]}，不存在或损坏时返回空清单"""
+        manifest_file = os.path.join(output_dir, BATCH_MANIFEST_FILE)
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+    
+    @staticmethod
+    def save_manifest(output_dir: str, manifest: Dict[str, List[Any]]):
+        """保存处理清单"""
+        FileOperations.save_json(manifest, os.path.join(output_dir, BATCH_MANIFEST_FILE))
+    
+    @staticmethod
+    def file_change_key(file_path: str) -> List[int]:
+        """文件的 [修改时间(ns), 大小]，任一变化即视为文件已修改"""
+        st = os.stat(file_path)
+        return [st.st_mtime_ns, st.st_size]
+    
+    @staticmethod
+    def is_unchanged(manifest: Dict[str, List[Any]], file_path: str, change_key: List[int]) -> bool:
+        """文件是否已处理过、之后未修改，且输出文件仍存在"""
+        entry = manifest.get(os.path.abspath(file_path))
+        if not isinstance(entry, list) or len(entry) < 3:
+            return False
+        return entry[:2] == change_key and os.path.exists(entry[2])
+    
     def _filter_new_files(self, html_files: List[str], output_dir: str) -> List[str]:
         """过滤新文件（增量处理）"""
         new_files = []
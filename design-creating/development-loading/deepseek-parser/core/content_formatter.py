@@ -4,11 +4,15 @@ core/content_formatter.py - 修复版本
 """
 import re
 import html
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 
 from utils.logger import logger
 
+# 格式化结果缓存的最大条目数（超出时淘汰最久未使用的结果）
+FORMAT_CACHE_SIZE = 256
+
 
 class ContentFormatter:
     """处理特殊内容格式：代码、表格、公式等"""
@@ -38,6 +42,9 @@ class ContentFormatter:
             'min_cols': 2
         }
         
+        # 格式化结果缓存：(内容, 类型) -> 格式化结果，重复的内容只格式化一次（LRU，最多FORMAT_CACHE_SIZE条）
+        self._format_cache = OrderedDict()
+        
         # 初始化正则表达式
         self._init_regex_patterns()
     
@@ -87,7 +94,29 @@ class ContentFormatter:
         4. 链接：转换为Markdown链接
         5. 标题：确保正确的层级（从##开始）
         6. 清理：移除多余的HTML标签
+        
+        结果按内容和类型缓存（最多FORMAT_CACHE_SIZE条），处理完一个对话后可调用clear_cache()释放。
         """
+        if not isinstance(content, str) or not content:
+            return self._format_content(content, content_type)
+        
+        cache_key = (content, content_type)
+        formatted_content = self._format_cache.get(cache_key)
+        if formatted_content is None:
+            formatted_content = self._format_content(content, content_type)
+            self._format_cache[cache_key] = formatted_content
+            if len(self._format_cache) > FORMAT_CACHE_SIZE:
+                self._format_cache.popitem(last=False)
+        else:
+            self._format_cache.move_to_end(cache_key)
+        return formatted_content
+    
+    def clear_cache(self):
+        """清空格式化结果缓存"""
+        self._format_cache.clear()
+    
+    def _format_content(self, content: str, content_type: str) -> str:
+        """格式化单段内容（不经过缓存）"""
         if not content:
             return ""
         
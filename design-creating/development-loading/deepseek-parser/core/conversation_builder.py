@@ -4,11 +4,54 @@ core/conversation_builder.py
 """
 import re
 import uuid
+from collections import Counter
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, FrozenSet, Tuple
 import logging
 
 from utils.logger import logger
+from core.content_formatter import ContentFormatter
+
+
+# 标点符号模式（关键词提取前替换为空格）
+_PUNCTUATION_PATTERN = re.compile(r'[^\w\s\u4e00-\u9fff]')
+
+
+# 只缓存不超过该长度的文本（标题、提问等短文本），完整回答逐条不同，缓存只会占用内存
+_KEYWORD_CACHE_MAX_LENGTH = 256
+
+
+def _extract_keywords_uncached(text: str, max_keywords: int,
+                               exclude_words: FrozenSet[str], min_word_length: int) -> Tuple[str, ...]:
+    """从已转为小写且不含代码块的文本中提取关键词"""
+    # 文本比最短关键词还短时不可能提取到关键词
+    if len(text) < min_word_length:
+        return ()
+    
+    # 移除标点符号
+    text = _PUNCTUATION_PATTERN.sub(' ', text)
+    
+    # 分词（简单的中英文分词），排除过短的词和常见词
+    words = [w for w in text.split() if len(w) >= min_word_length and w not in exclude_words]
+    
+    # 计算词频
+    word_freq = Counter(words)
+    
+    # 获取最常见的关键词（Counter的键本身已去重）
+    return tuple(word for word, count in word_freq.most_common(max_keywords))
+
+
+@lru_cache(maxsize=1024)
+def _extract_keywords_cached(text: str, max_keywords: int,
+                             exclude_words: FrozenSet[str], min_word_length: int) -> Tuple[str, ...]:
+    """
+    缓存短文本的关键词提取结果
+    
+    标题等短文本在不同对话中经常重复出现，缓存可避免重复分词；
+    返回元组以保证缓存结果不可变。
+    """
+    return _extract_keywords_uncached(text, max_keywords, exclude_words, min_word_length)
 
 
 class ConversationBuilder:
@@ -42,12 +85,50 @@ class ConversationBuilder:
         # 初始化计数器
         self.dialog_counter = self.id_config.get('start_number', 1)
         
-    def build(self, parsed_data: Dict[str, Any], dialog_id: Optional[str] = None) -> Dict[str, Any]:
+        # 非技术对话排除：整句寒暄用集合精确查找，其余模式合并为一个正则
+        self.exact_exclusions = frozenset({'你好', '谢谢', '再见', '好的', '明白了'})
+        self.exclusion_pattern = re.compile(
+            r'哈哈+|呵呵+|嘿嘿+'
+            r'|请帮我.*测试|测试一下|随便问问'
+            r'|^[\s\W]*$',  # 只有标点和空格
+            re.IGNORECASE
+        )
+        
+        # AI回答的技术内容特征（均为小写）
+        self.technical_indicators = (
+            '```',  # 代码块
+            '##',   # 二级及以下标题
+            '1.', '2.', '3.',  # 编号列表
+            '- ', '* ',  # 无序列表
+            '步骤', '方法', '配置', '代码', '示例',
+            '参数', '函数', '变量', '类', '对象',
+            '安装', '部署', '优化', '调试',
+            'python', 'java', 'html', 'css',  # java 同时覆盖 javascript
+            'docker', 'kubernetes', 'database', 'api',
+        )
+        
+        # 内容分析正则
+        self.list_pattern = re.compile(r'^\s*[\-\*\+]\s|\d+\.\s')
+        self.link_pattern = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+        self.code_block_pattern = re.compile(r'```[\s\S]*?```')
+        
+        # 构造后不再变化的配置项，展开为实例属性供热点方法直接读取
+        self._id_prefix = self.id_config.get('prefix', 'V')
+        self._id_digits = self.id_config.get('digits', 3)
+        self._min_word_length = self.keyword_config['min_word_length']
+        self._max_keywords = self.keyword_config['max_keywords']
+        # 排除词集合（可哈希，用作关键词缓存的键）
+        self._exclude_words = frozenset(self.keyword_config['exclude_words'])
+        
+    def build(self, parsed_data: Dict[str, Any], dialog_id: Optional[str] = None,
+              formatter: Optional[ContentFormatter] = None) -> Dict[str, Any]:
         """
         构建对话结构，包含：
         1. 为每个轮次生成唯一ID
         2. 提取关键词用于标题
         3. 分析内容结构（代码块、标题等）
+        4. 传入formatter时，在构建轮次的同时格式化用户和AI内容
+           （关键词等分析结果仍基于格式化前的内容）
         
         返回结构：
         {
@@ -90,6 +171,9 @@ class ConversationBuilder:
         try:
             self.logger.info("开始构建对话结构...")
             
+            # 本次构建的时间戳，所有轮次共用
+            created_at = datetime.now().isoformat()
+            
             # 生成对话ID
             dialog_id = dialog_id or self._generate_dialog_id()
             self.logger.debug(f"对话ID: {dialog_id}")
@@ -97,8 +181,9 @@ class ConversationBuilder:
             # 提取元数据
             metadata = self._extract_metadata(parsed_data, dialog_id)
             
-            # 构建轮次
+            # 构建轮次（同时累计总字数，复用轮次分析结果）
             rounds = []
+            total_words = 0
             for i, round_data in enumerate(parsed_data.get('rounds', [])):
                 round_num = i + 1
                 
@@ -108,16 +193,24 @@ class ConversationBuilder:
                     continue
                 
                 # 格式化轮次
-                formatted_round = self._format_round(round_data, dialog_id, round_num)
+                formatted_round = self._format_round(round_data, dialog_id, round_num, created_at)
                 if formatted_round:
+                    if formatter is not None:
+                        user_data = formatted_round['user']
+                        user_data['content'] = formatter.format_content(user_data['content'], 'user')
+                        ai_data = formatted_round['ai']
+                        ai_data['content'] = formatter.format_content(ai_data['content'], 'ai')
                     rounds.append(formatted_round)
+                    total_words += (formatted_round['user'].get('word_count', 0) +
+                                    formatted_round['ai'].get('word_count', 0))
             
             # 更新元数据
             metadata.update({
                 'total_rounds': len(rounds),
                 'technical_rounds': sum(1 for r in rounds if r['metadata']['is_technical']),
                 'title_keywords': self._extract_dialog_keywords(rounds),
-                'created_at': datetime.now().isoformat()
+                'estimated_total_words': total_words,
+                'created_at': created_at
             })
             
             conversation = {
@@ -134,20 +227,22 @@ class ConversationBuilder:
         except Exception as e:
             self.logger.error(f"构建对话结构失败: {e}")
             raise
+        
+        finally:
+            # 格式化缓存只在同一对话内复用（构建失败时同样释放）
+            if formatter is not None:
+                formatter.clear_cache()
     
     def _generate_dialog_id(self) -> str:
         """生成对话ID"""
-        prefix = self.id_config.get('prefix', 'V')
-        digits = self.id_config.get('digits', 3)
-        
         # 生成数字部分
         dialog_number = self.dialog_counter
         self.dialog_counter += 1
         
         # 格式化为固定位数
-        number_str = str(dialog_number).zfill(digits)
+        number_str = str(dialog_number).zfill(self._id_digits)
         
-        return f"{prefix}{number_str}"
+        return f"{self._id_prefix}{number_str}"
     
     def _extract_metadata(self, parsed_data: Dict[str, Any], dialog_id: str) -> Dict[str, Any]:
         """从解析数据中提取元数据"""
@@ -160,15 +255,6 @@ class ConversationBuilder:
         total_rounds = len(parsed_data.get('rounds', []))
         metadata['total_rounds_raw'] = total_rounds
         
-        # 估计总字数
-        total_words = 0
-        for round_data in parsed_data.get('rounds', []):
-            user_content = round_data.get('user', {}).get('content', '')
-            ai_content = round_data.get('ai', {}).get('content', '')
-            total_words += len(user_content.split()) + len(ai_content.split())
-        
-        metadata['estimated_total_words'] = total_words
-        
         return metadata
     
     def _is_valid_round(self, round_data: Dict[str, Any]) -> bool:
@@ -188,43 +274,21 @@ class ConversationBuilder:
     
     def _is_technical_conversation(self, user_content: str, ai_content: str) -> bool:
         """判断是否是技术对话"""
-        # 排除模式
-        exclusion_patterns = [
-            r'^你好$', r'^谢谢$', r'^再见$', r'^好的$', r'^明白了$',
-            r'哈哈+', r'呵呵+', r'嘿嘿+',
-            r'请帮我.*测试', r'测试一下', r'随便问问',
-            r'^[\s\W]*$',  # 只有标点和空格
-        ]
-        
-        # 检查用户问题
-        user_lower = user_content.lower()
-        for pattern in exclusion_patterns:
-            if re.search(pattern, user_lower, re.IGNORECASE):
-                return False
+        # 检查用户问题是否命中排除模式
+        user_stripped = user_content.strip()
+        if user_stripped in self.exact_exclusions or self.exclusion_pattern.search(user_stripped):
+            return False
         
-        # 检查AI回答是否有技术内容
-        technical_indicators = [
-            '```',  # 代码块
-            '##',   # 二级标题
-            '###',  # 三级标题
-            '1.', '2.', '3.',  # 编号列表
-            '- ', '* ',  # 无序列表
-            '步骤', '方法', '配置', '代码', '示例',
-            '参数', '函数', '变量', '类', '对象',
-            '安装', '部署', '配置', '优化', '调试',
-            'python', 'java', 'javascript', 'html', 'css',
-            'docker', 'kubernetes', 'database', 'api',
-        ]
+        # 较长的回答通常有内容，无需再逐项检查技术特征
+        if len(ai_content) > 100 and len(ai_content.strip()) > 100:
+            return True
         
+        # 检查较短的AI回答是否有技术内容（最常见的代码块/标题特征排在最前）
         ai_lower = ai_content.lower()
-        for indicator in technical_indicators:
-            if indicator.lower() in ai_lower:
-                return True
-        
-        # 较长的回答通常有内容
-        return len(ai_content.strip()) > 100
+        return any(indicator in ai_lower for indicator in self.technical_indicators)
     
-    def _format_round(self, round_data: Dict[str, Any], dialog_id: str, round_num: int) -> Optional[Dict[str, Any]]:
+    def _format_round(self, round_data: Dict[str, Any], dialog_id: str, round_num: int,
+                      created_at: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """格式化单个轮次"""
         try:
             round_id = f"{dialog_id}-{round_num}"
@@ -244,7 +308,7 @@ class ConversationBuilder:
             })
             
             # 提取轮次元数据
-            round_metadata = self._extract_round_metadata(user_data, ai_data, round_id)
+            round_metadata = self._extract_round_metadata(user_data, ai_data, round_id, created_at)
             
             formatted_round = {
                 'round_id': round_id,
@@ -260,31 +324,96 @@ class ConversationBuilder:
             return None
     
     def _analyze_content(self, content: str, content_type: str) -> Dict[str, Any]:
-        """分析内容特征"""
+        """
+        分析内容特征
+        
+        按行单次扫描内容，同时统计字数、代码块、标题、列表和链接，
+        代码块内的行不参与标题/列表/链接识别和关键词提取。
+        """
         if not content:
             return {}
         
         # 基础分析
-        word_count = len(content.split())
         char_count = len(content)
-        line_count = content.count('\n') + 1
         
-        # 提取关键词
-        keywords = self._extract_keywords(content)
+        # 只有空白字符时无需逐行扫描
+        if content.isspace():
+            return {
+                'content': content,
+                'word_count': 0,
+                'char_count': char_count,
+                'line_count': content.count('\n') + 1,
+                'keywords': [],
+                'has_code': False,
+                'code_blocks': [],
+                'has_headings': False,
+                'headings': [],
+                'has_lists': False,
+                'links': [],
+                'estimated_read_time': "1分钟",
+                'read_time_minutes': 1,
+                'content_type': content_type
+            }
         
-        # 检查代码块
-        code_blocks = self._extract_code_blocks_info(content)
-        has_code = len(code_blocks) > 0
+        lines = content.split('\n')
+        line_count = len(lines)
+        
+        word_count = 0
+        text_lines = []  # 代码块以外的行，用于提取关键词
+        code_blocks = []
+        headings = []
+        has_lists = False
+        links = []
         
-        # 检查标题
-        headings = self._extract_headings(content)
-        has_headings = len(headings) > 0
+        def scan_text_line(line: str, stripped: str):
+            nonlocal has_lists
+            text_lines.append(line)
+            
+            # 检查标题
+            heading = self._parse_heading(stripped)
+            if heading:
+                headings.append(heading)
+            
+            # 检查列表（找到一处即可）
+            if not has_lists and self.list_pattern.search(line):
+                has_lists = True
+            
+            # 检查链接
+            if '](' in line:
+                links.extend(self.link_pattern.findall(line))
         
-        # 检查列表
-        has_lists = bool(re.search(r'^\s*[\-\*\+]\s|\d+\.\s', content, re.MULTILINE))
+        in_code_block = False
+        fence_line = ''
+        code_language = ''
+        code_lines = []
         
-        # 检查链接
-        links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content)
+        for line in lines:
+            word_count += len(line.split())
+            stripped = line.strip()
+            
+            if stripped.startswith('```'):
+                if in_code_block:
+                    # 代码块结束
+                    code_blocks.append(self._code_block_info(code_language, code_lines))
+                    in_code_block = False
+                else:
+                    # 代码块开始
+                    in_code_block = True
+                    fence_line = line
+                    code_language = stripped[3:].strip() or 'text'
+                    code_lines = []
+            elif in_code_block:
+                code_lines.append(line)
+            else:
+                scan_text_line(line, stripped)
+        
+        # 未闭合的代码块按普通文本处理
+        if in_code_block:
+            for line in [fence_line] + code_lines:
+                scan_text_line(line, line.strip())
+        
+        # 提取关键词（代码块已在扫描时排除）
+        keywords = self._extract_keywords_from_text('\n'.join(text_lines).lower(), self._max_keywords)
         
         # 估算阅读时间（按200字/分钟）
         read_time_minutes = max(1, word_count // 200)
@@ -295,13 +424,14 @@ class ConversationBuilder:
             'char_count': char_count,
             'line_count': line_count,
             'keywords': keywords,
-            'has_code': has_code,
+            'has_code': len(code_blocks) > 0,
             'code_blocks': code_blocks,
-            'has_headings': has_headings,
+            'has_headings': len(headings) > 0,
             'headings': headings,
             'has_lists': has_lists,
             'links': links,
             'estimated_read_time': f"{read_time_minutes}分钟",
+            'read_time_minutes': read_time_minutes,
             'content_type': content_type
         }
     
@@ -310,82 +440,63 @@ class ConversationBuilder:
         if not content:
             return []
         
-        # 清理内容
-        content_lower = content.lower()
-        
-        # 移除代码块
-        content_without_code = re.sub(r'```[\s\S]*?```', '', content_lower)
-        
-        # 移除标点符号
-        text = re.sub(r'[^\w\s\u4e00-\u9fff]', ' ', content_without_code)
-        
-        # 分词（简单的中英文分词）
-        words = []
-        for word in text.split():
-            word = word.strip()
-            if len(word) >= self.keyword_config['min_word_length']:
-                words.append(word)
-        
-        # 排除常见词
-        exclude_words = set(self.keyword_config['exclude_words'])
-        filtered_words = [w for w in words if w not in exclude_words]
+        # 清理内容并移除代码块（不含代码块标记时跳过正则替换）
+        content_without_code = content.lower()
+        if '```' in content_without_code:
+            content_without_code = self.code_block_pattern.sub('', content_without_code)
         
-        # 计算词频
-        from collections import Counter
-        word_freq = Counter(filtered_words)
-        
-        # 获取最常见的关键词
-        common_words = word_freq.most_common(max_keywords)
-        keywords = [word for word, count in common_words]
+        # 只有代码或空白时没有可提取的关键词
+        if not content_without_code.strip():
+            return []
         
-        # 去重并返回
-        return list(dict.fromkeys(keywords))[:max_keywords]
+        return self._extract_keywords_from_text(content_without_code, max_keywords)
     
-    def _extract_code_blocks_info(self, content: str) -> List[Dict[str, Any]]:
-        """提取代码块信息"""
-        code_blocks = []
-        
-        # 查找所有代码块
-        pattern = r'```(\w*)\n([\s\S]*?)```'
-        matches = re.finditer(pattern, content)
-        
-        for match in matches:
-            language = match.group(1) or 'text'
-            code = match.group(2)
-            lines = code.count('\n') + 1
-            
-            code_blocks.append({
-                'language': language,
-                'line_count': lines,
-                'char_count': len(code),
-                'has_complexity': len(code) > 100  # 简单判断是否复杂
-            })
+    def _extract_keywords_from_text(self, text: str, max_keywords: int = 5) -> List[str]:
+        """从已转为小写且不含代码块的文本中提取关键词"""
+        if len(text) <= _KEYWORD_CACHE_MAX_LENGTH:
+            extract = _extract_keywords_cached
+        else:
+            extract = _extract_keywords_uncached
+        return list(extract(
+            text,
+            max_keywords,
+            self._exclude_words,
+            self._min_word_length
+        ))
+    
+    def _code_block_info(self, language: str, code_lines: List[str]) -> Dict[str, Any]:
+        """生成代码块信息（行数直接取自已切分的行列表）"""
+        # 每行以换行符结尾，与按```...```截取的代码文本一致
+        code = ''.join(line + '\n' for line in code_lines)
         
-        return code_blocks
+        return {
+            'language': language,
+            'line_count': len(code_lines) + 1,
+            'char_count': len(code),
+            'has_complexity': len(code) > 100  # 简单判断是否复杂
+        }
     
-    def _extract_headings(self, content: str) -> List[Dict[str, Any]]:
-        """提取标题信息"""
-        headings = []
+    def _parse_heading(self, line: str) -> Optional[Dict[str, Any]]:
+        """解析单行（已去除首尾空白）Markdown标题，非标题行返回None"""
+        # 绝大多数行不以#开头，直接跳过
+        if not line.startswith('#'):
+            return None
         
-        # 查找Markdown标题
-        pattern = r'^(#{1,6})\s+(.+)$'
-        lines = content.split('\n')
+        # #的数量为1~6个，且后面紧跟空白和标题文字
+        level = len(line) - len(line.lstrip('#'))
+        if level > 6 or level == len(line) or not line[level].isspace():
+            return None
         
-        for line in lines:
-            match = re.match(pattern, line.strip())
-            if match:
-                level = len(match.group(1))  # #的数量
-                text = match.group(2).strip()
-                
-                headings.append({
-                    'level': level,
-                    'text': text,
-                    'keywords': self._extract_keywords(text, 3)
-                })
+        text = line[level:].strip()
         
-        return headings
+        return {
+            'level': level,
+            'text': text,
+            'keywords': self._extract_keywords(text, 3)
+        }
     
-    def _extract_round_metadata(self, user_data: Dict[str, Any], ai_data: Dict[str, Any], round_id: str) -> Dict[str, Any]:
+    def _extract_round_metadata(self, user_data: Dict[str, Any], ai_data: Dict[str, Any], round_id: str,
+                                created_at: Optional[str] = None) -> Dict[str, Any]:
         """提取轮次元数据"""
         # 判断是否是技术对话
         is_technical = self._is_round_technical(user_data, ai_data)
@@ -394,8 +505,8 @@ class ConversationBuilder:
         main_topic = self._extract_main_topic(user_data, ai_data)
         
         # 估算总阅读时间
-        user_time = int(user_data.get('estimated_read_time', '0分钟').replace('分钟', '')) or 0
-        ai_time = int(ai_data.get('estimated_read_time', '0分钟').replace('分钟', '')) or 0
+        user_time = user_data.get('read_time_minutes', 0)
+        ai_time = ai_data.get('read_time_minutes', 0)
         total_time = user_time + ai_time
         
         # 计算技术复杂度
@@ -409,7 +520,7 @@ class ConversationBuilder:
             'complexity_score': complexity_score,
             'has_code': ai_data.get('has_code', False),
             'has_headings': ai_data.get('has_headings', False),
-            'created_at': datetime.now().isoformat()
+            'created_at': created_at or datetime.now().isoformat()
         }
     
     def _is_round_technical(self, user_data: Dict[str, Any], ai_data: Dict[str, Any]) -> bool:
@@ -447,7 +558,6 @@ class ConversationBuilder:
             return "未分类"
         
         # 返回最多出现的关键词
-        from collections import Counter
         keyword_counts = Counter(all_keywords)
         main_keyword = keyword_counts.most_common(1)[0][0]
         
@@ -499,7 +609,6 @@ class ConversationBuilder:
             return "未分类"
         
         # 统计词频
-        from collections import Counter
         keyword_counts = Counter(all_keywords)
         
         # 获取前3个关键词
@@ -2,14 +2,127 @@
 core/deepseek_parser.py
 DeepSeek专用HTML解析器
 """
+import os
 import re
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
 import html2text
+import soupsieve
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Any, Tuple, Union
 import logging
 
-from utils.logger import logger
+from utils.logger import logger, get_logger
+from utils.file_ops import FileOperations
+
+# 可选：Rust实现的HTML转Markdown转换器，未安装时回退到html2text
+try:
+    from html_to_markdown import convert as html_to_markdown_convert, ConversionOptions
+    HAS_HTML_TO_MARKDOWN = True
+except ImportError:
+    HAS_HTML_TO_MARKDOWN = False
+
+# 预编译的类名/文本匹配模式
+# 结构识别用的原始HTML标记（长的写在前面，优先匹配）
+_STRUCTURE_MARKER_PATTERN = re.compile(r'deepseek-chat-container|deepseek-version|deepseek|legacy', re.I)
+_MESSAGE_CLASS_PATTERN = re.compile(r'message|msg|chat', re.I)
+_BUBBLE_CLASS_PATTERN = re.compile(r'message|chat|bubble', re.I)
+_TIME_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}')
+# SoupStrainer只保留类名命中这些关键词的节点
+_STRAINER_CLASS_PATTERN = re.compile(r'message|msg|chat|bubble|conversation|round|assistant|user|human', re.I)
+
+# 通用解析中判断消息角色的关键词（按子串匹配类名和HTML）
+_USER_ROLE_WORDS = ('user', 'human', 'question', 'input')
+_AI_ROLE_WORDS = ('assistant', 'ai', 'answer', 'response', 'deepseek')
+
+# Markdown清理：连续空行
+_EXTRA_BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+
+# 移动端特征（小写）及检测时扫描的文档开头长度
+_MOBILE_INDICATORS = ('viewport', 'mobile', 'mozilla/5.0 (iphone', 'android')
+_MOBILE_PROBE_LENGTH = 4096
+
+# 非技术对话的排除规则：整句寒暄直接查集合，其余模式合并为一个正则
+_EXACT_EXCLUSIONS = frozenset({'你好', '谢谢', '再见', '好的', '明白了'})
+_EXCLUSION_PATTERN = re.compile(
+    r'哈哈+|呵呵+|嘿嘿+|请帮我.*测试|测试一下|随便问问|^[\s\W]*$',  # 最后一项: 只有标点和空格
+    re.IGNORECASE
+)
+# 只缓存不超过该长度的用户问题的排除判断结果
+_EXCLUSION_CACHE_MAX_LENGTH = 256
+
+# 技术内容指标（合并为一个正则，一次扫描即可判断）
+_TECHNICAL_INDICATORS = [
+    '```',  # 代码块
+    '##',   # 二级/三级标题
+    '1.', '2.', '3.',  # 编号列表
+    '- ', '* ',  # 无序列表
+    '步骤', '方法', '配置', '代码', '示例',
+    '参数', '函数', '变量', '类', '对象',
+    '安装', '部署', '优化', '调试',
+    'python', 'java', 'html', 'css',
+    'docker', 'kubernetes', 'database', 'api',
+]
+_TECHNICAL_PATTERN = re.compile('|'.join(map(re.escape, _TECHNICAL_INDICATORS)), re.IGNORECASE)
+
+
+def _has_technical_indicator(ai_content: str) -> bool:
+    """AI回答中是否出现任一技术指标"""
+    # 代码块标记本身就是指标，含代码的回答无需扫描
+    if '```' in ai_content:
+        return True
+    
+    # 一次扫描即可找到任意指标
+    return _TECHNICAL_PATTERN.search(ai_content) is not None
+
+
+def _match_exclusion(user_content: str) -> bool:
+    """用户问题是否为空或属于寒暄/测试等非技术内容"""
+    if user_content.strip() in _EXACT_EXCLUSIONS:
+        return True
+    return bool(_EXCLUSION_PATTERN.search(user_content))
+
+
+# 寒暄等短问题经常重复出现，结果值得缓存；长问题逐条不同，直接判断
+_match_exclusion_cached = lru_cache(maxsize=1024)(_match_exclusion)
+
+
+def _is_excluded_text(user_content: str) -> bool:
+    """用户问题是否为空或属于寒暄/测试等非技术内容（只缓存短问题的结果）"""
+    if len(user_content) <= _EXCLUSION_CACHE_MAX_LENGTH:
+        return _match_exclusion_cached(user_content)
+    return _match_exclusion(user_content)
+
+
+def _is_technical_text(user_content: str, ai_content: str) -> bool:
+    """判断一问一答是否为技术对话"""
+    # 检查用户问题
+    if _is_excluded_text(user_content):
+        return False
+    
+    # 检查AI回答是否有技术内容
+    if _has_technical_indicator(ai_content):
+        return True
+    
+    # 较长的回答通常有内容
+    return len(ai_content.strip()) > 100
+
+
+class _Message(NamedTuple):
+    """页面中找到的单条消息（配对前）"""
+    type: str  # 'user' 或 'ai'
+    raw_html: str
+    timestamp: Optional[str]
+    order: int  # 在文档中的位置
+
+
+def _markdown_text(result: Any) -> str:
+    """取出html-to-markdown的转换结果（不同主版本返回str或带content属性的结果对象）"""
+    if isinstance(result, str):
+        return result
+    return result.content
 
 
 class DeepSeekParser:
@@ -49,11 +162,55 @@ class DeepSeekParser:
             '[data-time]',
         ]
         
+        # 解析树后端: lxml（默认，C实现）/ html.parser / html5lib
+        self.html_parser = parsing_config.get('html_parser', 'lxml')
+        if builder_registry.lookup(self.html_parser) is None:
+            self.logger.warning(f"HTML解析后端不可用: {self.html_parser}，回退到html.parser")
+            self.html_parser = 'html.parser'
+        
         # 初始化HTML到Markdown转换器
-        self.html2text_converter = html2text.HTML2Text()
-        self.html2text_converter.ignore_links = False
-        self.html2text_converter.ignore_images = True
-        self.html2text_converter.body_width = 0  # 不换行
+        # markdown_backend: auto（优先html-to-markdown）/ html-to-markdown / html2text
+        markdown_backend = parsing_config.get('markdown_backend', 'auto')
+        self.use_html_to_markdown = HAS_HTML_TO_MARKDOWN and markdown_backend != 'html2text'
+        if markdown_backend == 'html-to-markdown' and not HAS_HTML_TO_MARKDOWN:
+            self.logger.warning("未安装html-to-markdown，回退到html2text")
+        
+        if self.use_html_to_markdown:
+            try:
+                self.markdown_options = ConversionOptions(
+                    heading_style='atx',
+                    wrap=False,  # 不换行
+                    skip_images=True
+                )
+            except TypeError as e:
+                # 已安装的版本不支持这些选项
+                self.logger.warning(f"html-to-markdown版本不兼容({e})，回退到html2text")
+                self.use_html_to_markdown = False
+        
+        if not self.use_html_to_markdown:
+            self.html2text_converter = html2text.HTML2Text()
+            self.html2text_converter.ignore_links = False
+            self.html2text_converter.ignore_images = True
+            self.html2text_converter.body_width = 0  # 不换行
+        
+        # 只构建消息相关节点的解析树（跳过script/style/导航等无关标签）
+        self.use_soup_strainer = parsing_config.get('soup_strainer', False)
+        self.soup_strainer = SoupStrainer(
+            ['div', 'section', 'article', 'li', 'time', 'main'],
+            class_=_STRAINER_CLASS_PATTERN
+        )
+        
+        # 单条消息内容的最大长度
+        self.max_content_length = parsing_config.get('max_content_length', 10000)
+        
+        # 预编译的CSS选择器缓存（键为选择器元组）
+        self._selector_cache = {}
+        
+        # 单次解析内的Markdown转换缓存（键为元素HTML），解析结束后清空
+        self._content_cache = {}
+        
+        # 单次解析内的消息元素查询结果 (soup, 结果)，结构识别和消息提取共用
+        self._message_elements = None
         
         # 缓存上次解析的结构，用于启发式匹配
         self.last_structure = None
@@ -89,22 +246,19 @@ class DeepSeekParser:
         try:
             self.logger.info("开始解析HTML内容...")
             
-            # 解析HTML
-            soup = BeautifulSoup(html_content, 'lxml')
-            
-            # 识别DeepSeek结构
-            structure_type = self._identify_structure(soup)
-            self.logger.debug(f"识别到结构类型: {structure_type}")
-            
-            # 根据结构类型选择解析策略
-            if structure_type == 'new_version':
-                parsed_data = self._parse_new_version(soup)
-            elif structure_type == 'old_version':
-                parsed_data = self._parse_old_version(soup)
-            elif structure_type == 'mobile_version':
-                parsed_data = self._parse_mobile_version(soup)
+            # 解析HTML（启用过滤时只保留消息相关节点）
+            if self.use_soup_strainer:
+                soup = BeautifulSoup(html_content, self.html_parser, parse_only=self.soup_strainer)
+                structure_type, parsed_data = self._parse_soup(soup, html_content)
+                
+                # 过滤后的解析树中没有找到对话时，回退到完整解析
+                if not parsed_data.get('rounds'):
+                    self.logger.debug("过滤解析未找到对话，回退到完整解析")
+                    soup = BeautifulSoup(html_content, self.html_parser)
+                    structure_type, parsed_data = self._parse_soup(soup, html_content)
             else:
-                parsed_data = self._generic_parse(soup)
+                soup = BeautifulSoup(html_content, self.html_parser)
+                structure_type, parsed_data = self._parse_soup(soup, html_content)
             
             # 清理和验证数据
             parsed_data = self._clean_parsed_data(parsed_data)
@@ -115,7 +269,7 @@ class DeepSeekParser:
                 'parsed_at': datetime.now().isoformat(),
                 'total_rounds': len(parsed_data.get('rounds', [])),
                 'structure_type': structure_type,
-                'valid_rounds': self._count_valid_rounds(parsed_data.get('rounds', []))
+                'valid_rounds': len(parsed_data.get('rounds', []))  # 清理后只剩有效轮次
             }
             
             self.logger.info(f"解析完成，共发现 {parsed_data['metadata']['total_rounds']} 轮对话")
@@ -126,44 +280,76 @@ class DeepSeekParser:
         except Exception as e:
             self.logger.error(f"解析HTML失败: {e}")
             raise
+        finally:
+            self._content_cache.clear()
+            self._message_elements = None
     
-    def _identify_structure(self, soup: BeautifulSoup) -> str:
-        """识别DeepSeek特定的HTML结构"""
+    def parse_files(self, file_paths: List[str],
+                    max_workers: Optional[int] = None) -> Iterator[Tuple[str, Union[Dict[str, Any], Exception]]]:
+        """
+        使用多进程并行解析多个HTML文件
         
-        # 检查是否有已知的DeepSeek特定元素
-        deepseek_indicators = [
-            ('deepseek', lambda s: s.find(string=re.compile(r'deepseek', re.I))),
-            ('api_version', lambda s: s.find('meta', {'name': 'deepseek-version'})),
-            ('new_version_div', lambda s: s.select_one('.deepseek-chat-container')),
-            ('old_version_div', lambda s: s.select_one('.chat-container.legacy')),
-        ]
+        每个工作进程启动时创建一次解析器，按输入顺序逐个返回
+        (文件路径, 解析结果)；读取或解析失败时解析结果为对应的异常。
+        """
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(),
+            initializer=_init_parse_worker,
+            initargs=(self.config,)
+        )
+        try:
+            for file_path, result in zip(file_paths, executor.map(_parse_file_in_worker, file_paths)):
+                yield file_path, result
+        finally:
+            # 提前停止迭代时（如遇错停止）取消尚未开始的任务
+            executor.shutdown(wait=True, cancel_futures=True)
+    
+    def _parse_soup(self, soup: BeautifulSoup, html_content: Optional[str] = None):
+        """识别结构并按对应策略解析，返回 (结构类型, 解析结果)"""
+        # 识别DeepSeek结构
+        structure_type = self._identify_structure(soup, html_content)
+        self.logger.debug(f"识别到结构类型: {structure_type}")
+        
+        # 根据结构类型选择解析策略
+        if structure_type == 'new_version':
+            parsed_data = self._parse_new_version(soup)
+        elif structure_type == 'old_version':
+            parsed_data = self._parse_old_version(soup)
+        elif structure_type == 'mobile_version':
+            parsed_data = self._parse_mobile_version(soup)
+        else:
+            parsed_data = self._generic_parse(soup)
         
-        for name, check_func in deepseek_indicators:
-            if check_func(soup):
+        return structure_type, parsed_data
+    
+    def _identify_structure(self, soup: BeautifulSoup, html_content: Optional[str] = None) -> str:
+        """识别DeepSeek特定的HTML结构"""
+        # 原始HTML文本
+        if html_content is None:
+            html_content = str(soup)
+        
+        # 先在原始HTML中一次扫描出所有DeepSeek标记，没有对应标记时不再查询解析树
+        markers = {match.group(0).lower() for match in _STRUCTURE_MARKER_PATTERN.finditer(html_content)}
+        for name in ('deepseek', 'deepseek-version'):
+            if name in markers:
                 self.logger.debug(f"发现DeepSeek标识: {name}")
-                # 根据标识判断版本
-                if 'new' in name:
-                    return 'new_version'
-                elif 'old' in name or 'legacy' in name:
-                    return 'old_version'
-        
-        # 检查移动端特征
-        mobile_indicators = [
-            'viewport',
-            'mobile',
-            'Mozilla/5.0 (iPhone',
-            'Android'
-        ]
         
-        html_str = str(soup)
-        for indicator in mobile_indicators:
-            if indicator.lower() in html_str.lower():
-                self.logger.debug("发现移动端特征")
-                return 'mobile_version'
+        if 'deepseek-chat-container' in markers and soup.select_one('.deepseek-chat-container'):
+            self.logger.debug("发现DeepSeek标识: new_version_div")
+            return 'new_version'
+        if 'legacy' in markers and soup.select_one('.chat-container.legacy'):
+            self.logger.debug("发现DeepSeek标识: old_version_div")
+            return 'old_version'
+        
+        # 检查移动端特征（viewport等标识一般在<head>中，只扫描原始HTML的开头）
+        html_head = html_content[:_MOBILE_PROBE_LENGTH].lower()
+        
+        if any(indicator in html_head for indicator in _MOBILE_INDICATORS):
+            self.logger.debug("发现移动端特征")
+            return 'mobile_version'
         
         # 使用启发式方法
-        user_elements = self._find_elements(soup, self.USER_SELECTORS)
-        ai_elements = self._find_elements(soup, self.AI_SELECTORS)
+        user_elements, ai_elements, _ = self._find_message_elements(soup)
         
         if len(user_elements) > 0 and len(ai_elements) > 0:
             # 检查是否是成对出现
@@ -216,7 +402,7 @@ class DeepSeekParser:
         
         if message_list:
             for msg_container in message_list[0].find_all('li', recursive=False):
-                round_data = self._parse_message_container(msg_container)
+                round_data = self._parse_conversation_container(msg_container)
                 if round_data:
                     rounds.append(round_data)
         else:
@@ -260,8 +446,16 @@ class DeepSeekParser:
             if not user_element or not ai_element:
                 return None
             
-            user_content = self._extract_content(user_element)
-            ai_content = self._extract_content(ai_element)
+            # 每个元素只序列化一次
+            user_html = str(user_element)
+            ai_html = str(ai_element)
+            
+            # 用户问题被排除时不再转换AI回答
+            user_content = self._extract_content_from_html(user_html)
+            if self._is_excluded_question(user_content):
+                self.logger.debug(f"过滤无效轮次: {user_content[:50]}...")
+                return None
+            ai_content = self._extract_content_from_html(ai_html)
             
             user_timestamp = self._extract_timestamp(user_element)
             ai_timestamp = self._extract_timestamp(ai_element)
@@ -270,85 +464,73 @@ class DeepSeekParser:
                 'user': {
                     'content': user_content,
                     'timestamp': user_timestamp,
-                    'raw_html': str(user_element)
+                    'raw_html': user_html
                 },
                 'ai': {
                     'content': ai_content,
                     'timestamp': ai_timestamp,
-                    'raw_html': str(ai_element)
+                    'raw_html': ai_html
                 }
             }
         except Exception as e:
             self.logger.debug(f"解析对话容器失败: {e}")
             return None
     
-    def _find_all_messages(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
-        """查找所有消息元素"""
+    def _find_all_messages(self, soup: BeautifulSoup) -> List[_Message]:
+        """查找所有消息元素（内容在配对时才转换）"""
         messages = []
+        user_elements, ai_elements, positions = self._find_message_elements(soup)
         
-        # 查找用户消息
-        user_elements = self._find_elements(soup, self.USER_SELECTORS)
+        # 用户消息
         for elem in user_elements:
-            messages.append({
-                'type': 'user',
-                'element': elem,
-                'content': self._extract_content(elem),
-                'timestamp': self._extract_timestamp(elem),
-                'order': self._get_element_order(elem)
-            })
-        
-        # 查找AI消息
-        ai_elements = self._find_elements(soup, self.AI_SELECTORS)
+            messages.append(_Message(
+                'user', str(elem), self._extract_timestamp(elem), positions[id(elem)]
+            ))
+        
+        # AI消息
         for elem in ai_elements:
-            messages.append({
-                'type': 'ai',
-                'element': elem,
-                'content': self._extract_content(elem),
-                'timestamp': self._extract_timestamp(elem),
-                'order': self._get_element_order(elem)
-            })
+            messages.append(_Message(
+                'ai', str(elem), self._extract_timestamp(elem), positions[id(elem)]
+            ))
         
-        # 按顺序排序
-        messages.sort(key=lambda x: x['order'])
+        # 按文档顺序排序（同一元素既是用户又是AI时用户在前）
+        messages.sort(key=lambda x: x.order)
         
         return messages
     
-    def _pair_messages(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """将消息配对成对话轮次"""
-        rounds = []
-        i = 0
+    def _pair_messages(self, messages: List[_Message]) -> List[Dict[str, Any]]:
+        """
+        将消息配对成对话轮次（单次遍历）
         
-        while i < len(messages):
-            current_msg = messages[i]
-            
-            if current_msg['type'] == 'user':
-                # 查找下一个AI消息
-                ai_msg = None
-                for j in range(i + 1, len(messages)):
-                    if messages[j]['type'] == 'ai':
-                        ai_msg = messages[j]
-                        break
-                
-                if ai_msg:
+        只转换配对成功的消息内容，用户问题被排除时跳过AI回答的转换。
+        """
+        rounds = []
+        pending_user = None
+        
+        for msg in messages:
+            if msg.type == 'user':
+                # 等待配对期间出现的其他用户消息被跳过
+                if pending_user is None:
+                    pending_user = msg
+            elif pending_user is not None:
+                user_content = self._extract_content_from_html(pending_user.raw_html)
+                if self._is_excluded_question(user_content):
+                    self.logger.debug(f"过滤无效轮次: {user_content[:50]}...")
+                else:
                     rounds.append({
                         'user': {
-                            'content': current_msg['content'],
-                            'timestamp': current_msg['timestamp'],
-                            'raw_html': str(current_msg['element'])
+                            'content': user_content,
+                            'timestamp': pending_user.timestamp,
+                            'raw_html': pending_user.raw_html
                         },
                         'ai': {
-                            'content': ai_msg['content'],
-                            'timestamp': ai_msg['timestamp'],
-                            'raw_html': str(ai_msg['element'])
+                            'content': self._extract_content_from_html(msg.raw_html),
+                            'timestamp': msg.timestamp,
+                            'raw_html': msg.raw_html
                         }
                     })
-                    i = j + 1  # 跳过已使用的AI消息
-                else:
-                    # 没有配对的AI消息
-                    i += 1
-            else:
-                # 跳过孤立的AI消息
-                i += 1
+                pending_user = None
+            # 否则是孤立的AI消息，跳过
         
         return rounds
     
@@ -357,31 +539,37 @@ class DeepSeekParser:
         if not element:
             return ""
         
+        return self._extract_content_from_html(str(element))
+    
+    def _extract_content_from_html(self, html_content: str) -> str:
+        """从已序列化的HTML中提取内容"""
+        # 同一元素可能同时被识别为用户和AI消息，或在回退解析时再次出现
+        cached = self._content_cache.get(html_content)
+        if cached is not None:
+            return cached
+        
         # 转换为Markdown
-        html_content = str(element)
-        markdown = self.html2text_converter.handle(html_content)
+        if self.use_html_to_markdown:
+            markdown = _markdown_text(html_to_markdown_convert(html_content, self.markdown_options))
+        else:
+            markdown = self.html2text_converter.handle(html_content)
         
         # 清理Markdown
-        markdown = self._clean_markdown(markdown)
+        markdown = self._clean_markdown(markdown).strip()
         
-        return markdown.strip()
+        self._content_cache[html_content] = markdown
+        return markdown
     
     def _clean_markdown(self, markdown: str) -> str:
-        """清理Markdown内容"""
-        # 移除多余的空行
-        lines = markdown.split('\n')
-        cleaned_lines = []
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if line:
-                cleaned_lines.append(line)
-            elif cleaned_lines and cleaned_lines[-1]:  # 保留一个空行
-                cleaned_lines.append('')
+        """清理Markdown内容：去除每行首尾空白，连续空行只保留一个"""
+        # 移除多余的空行（开头的空行全部去掉，末尾的空行保留一个）
+        lines = [line.strip() for line in markdown.split('\n')]
+        result = _EXTRA_BLANK_LINES_PATTERN.sub('\n\n', '\n'.join(lines)).lstrip('\n')
+        if result.endswith('\n\n'):
+            result = result[:-1]
         
         # 限制最大长度
-        max_length = self.config.get('parsing', {}).get('max_content_length', 10000)
-        result = '\n'.join(cleaned_lines)
+        max_length = self.max_content_length
         
         if len(result) > max_length:
             result = result[:max_length] + "...\n[内容过长已截断]"
@@ -413,7 +601,7 @@ class DeepSeekParser:
                 if 'time' in cls.lower():
                     # 尝试从文本中提取时间
                     text = element.get_text()
-                    time_match = re.search(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}', text)
+                    time_match = _TIME_PATTERN.search(text)
                     if time_match:
                         timestamp = time_match.group(0)
                         break
@@ -427,41 +615,97 @@ class DeepSeekParser:
         
         return timestamp
     
-    def _get_element_order(self, element) -> int:
-        """获取元素在文档中的顺序"""
-        # 使用元素的源码位置作为顺序
-        try:
-            return element.sourceline or 0
-        except:
-            return 0
+    def _compile_selectors(self, selectors: List[str]) -> List:
+        """预编译选择器列表（按选择器元组缓存，无效的选择器会被跳过）"""
+        key = tuple(selectors)
+        compiled = self._selector_cache.get(key)
+        
+        if compiled is None:
+            compiled = []
+            for selector in selectors:
+                try:
+                    compiled.append(soupsieve.compile(selector))
+                except Exception as e:
+                    self.logger.debug(f"选择器 {selector} 无效: {e}")
+            self._selector_cache[key] = compiled
+        
+        return compiled
     
     def _find_elements(self, soup: BeautifulSoup, selectors: List[str]) -> List:
         """使用多个选择器查找元素"""
         all_elements = []
         seen = set()
         
-        for selector in selectors:
+        for selector in self._compile_selectors(selectors):
             try:
-                elements = soup.select(selector)
+                elements = selector.select(soup)
                 for elem in elements:
                     elem_id = id(elem)
                     if elem_id not in seen:
                         seen.add(elem_id)
                         all_elements.append(elem)
             except Exception as e:
-                self.logger.debug(f"选择器 {selector} 失败: {e}")
+                self.logger.debug(f"选择器 {selector.pattern} 失败: {e}")
                 continue
         
         return all_elements
     
+    def _find_message_elements(self, soup: BeautifulSoup):
+        """
+        一次遍历同时查找用户消息和AI消息元素
+        
+        先用合并后的选择器组做一次查询得到候选元素，再按各元素命中的
+        第一个选择器归组，结果顺序与依次执行
+        _find_elements(soup, USER_SELECTORS/AI_SELECTORS) 相同。
+        
+        返回 (用户元素, AI元素, {id(元素): 文档中的位置})；同一棵解析树只查询一次。
+        """
+        if self._message_elements is not None and self._message_elements[0] is soup:
+            return self._message_elements[1]
+        
+        user_selectors = self._compile_selectors(self.USER_SELECTORS)
+        ai_selectors = self._compile_selectors(self.AI_SELECTORS)
+        if not user_selectors and not ai_selectors:
+            return [], [], {}
+        
+        key = ('__messages__',) + tuple(self.USER_SELECTORS) + tuple(self.AI_SELECTORS)
+        combined = self._selector_cache.get(key)
+        if combined is None:
+            combined = soupsieve.compile(
+                ', '.join(sel.pattern for sel in user_selectors + ai_selectors)
+            )
+            self._selector_cache[key] = combined
+        
+        user_groups = [[] for _ in user_selectors]
+        ai_groups = [[] for _ in ai_selectors]
+        positions = {}
+        
+        # select()按文档顺序返回，位置序号即元素在文档中的先后
+        for position, elem in enumerate(combined.select(soup)):
+            positions[id(elem)] = position
+            for i, selector in enumerate(user_selectors):
+                if selector.match(elem):
+                    user_groups[i].append(elem)
+                    break
+            for i, selector in enumerate(ai_selectors):
+                if selector.match(elem):
+                    ai_groups[i].append(elem)
+                    break
+        
+        user_elements = [elem for group in user_groups for elem in group]
+        ai_elements = [elem for group in ai_groups for elem in group]
+        result = (user_elements, ai_elements, positions)
+        self._message_elements = (soup, result)
+        return result
+    
     def _find_first_element(self, container, selectors: List[str]):
-        """在容器内查找第一个匹配的元素"""
-        for selector in selectors:
+        """在容器内查找第一个匹配的元素（按选择器优先级）"""
+        for selector in self._compile_selectors(selectors):
             try:
-                element = container.select_one(selector)
+                element = selector.select_one(container)
                 if element:
                     return element
-            except:
+            except Exception:
                 continue
         return None
     
@@ -475,7 +719,7 @@ class DeepSeekParser:
         """按交替元素解析策略"""
         # 查找所有可能是消息的元素
         potential_messages = soup.find_all(['div', 'section', 'article'], 
-                                          class_=re.compile(r'message|chat|bubble', re.I))
+                                          class_=_BUBBLE_CLASS_PATTERN)
         
         rounds = []
         current_user = None
@@ -486,27 +730,28 @@ class DeepSeekParser:
                 continue
             
             # 判断是用户还是AI消息
-            elem_classes = ' '.join(elem.get('class', []))
-            elem_html = str(elem).lower()
+            elem_classes = ' '.join(elem.get('class', [])).lower()
+            raw_html = str(elem)
+            elem_html = raw_html.lower()
             
-            is_user = any(word in elem_classes.lower() or word in elem_html 
-                         for word in ['user', 'human', 'question', 'input'])
-            is_ai = any(word in elem_classes.lower() or word in elem_html 
-                       for word in ['assistant', 'ai', 'answer', 'response', 'deepseek'])
+            is_user = any(word in elem_classes or word in elem_html 
+                         for word in _USER_ROLE_WORDS)
+            is_ai = any(word in elem_classes or word in elem_html 
+                       for word in _AI_ROLE_WORDS)
             
             if is_user and not is_ai:
                 current_user = {
-                    'content': self._extract_content(elem),
+                    'content': self._extract_content_from_html(raw_html),
                     'timestamp': self._extract_timestamp(elem),
-                    'raw_html': str(elem)
+                    'raw_html': raw_html
                 }
             elif is_ai and current_user:
                 rounds.append({
                     'user': current_user,
                     'ai': {
-                        'content': self._extract_content(elem),
+                        'content': self._extract_content_from_html(raw_html),
                         'timestamp': self._extract_timestamp(elem),
-                        'raw_html': str(elem)
+                        'raw_html': raw_html
                     }
                 })
                 current_user = None
@@ -518,27 +763,29 @@ class DeepSeekParser:
         rounds = []
         
         # 查找所有具有常见对话类名的元素
-        for elem in soup.find_all(class_=re.compile(r'message|msg|chat', re.I)):
+        for elem in soup.find_all(class_=_MESSAGE_CLASS_PATTERN):
             parent = elem.parent
             if parent and parent not in [r['user']['raw_html'] for r in rounds if 'user' in r]:
                 # 尝试在父元素中查找配对
-                siblings = parent.find_all(class_=re.compile(r'message|msg|chat', re.I))
+                siblings = parent.find_all(class_=_MESSAGE_CLASS_PATTERN)
                 if len(siblings) >= 2:
                     # 假设前两个是用户和AI
                     user_elem = siblings[0]
                     ai_elem = siblings[1] if len(siblings) > 1 else None
                     
                     if ai_elem:
+                        user_html = str(user_elem)
+                        ai_html = str(ai_elem)
                         rounds.append({
                             'user': {
-                                'content': self._extract_content(user_elem),
+                                'content': self._extract_content_from_html(user_html),
                                 'timestamp': self._extract_timestamp(user_elem),
-                                'raw_html': str(user_elem)
+                                'raw_html': user_html
                             },
                             'ai': {
-                                'content': self._extract_content(ai_elem),
+                                'content': self._extract_content_from_html(ai_html),
                                 'timestamp': self._extract_timestamp(ai_elem),
-                                'raw_html': str(ai_elem)
+                                'raw_html': ai_html
                             }
                         })
         
@@ -553,9 +800,7 @@ class DeepSeekParser:
         valid_rounds = []
         for round_data in parsed_data['rounds']:
             if self._is_valid_round(round_data):
-                # 清理内容
-                round_data['user']['content'] = self._clean_content(round_data['user']['content'])
-                round_data['ai']['content'] = self._clean_content(round_data['ai']['content'])
+                # 内容在提取时已经过_clean_markdown清理
                 valid_rounds.append(round_data)
             else:
                 self.logger.debug(f"过滤无效轮次: {round_data.get('user', {}).get('content', '')[:50]}...")
@@ -580,63 +825,30 @@ class DeepSeekParser:
     
     def _is_technical_conversation(self, user_content: str, ai_content: str) -> bool:
         """判断是否是技术对话"""
-        # 排除模式
-        exclusion_patterns = [
-            r'^你好$', r'^谢谢$', r'^再见$', r'^好的$', r'^明白了$',
-            r'哈哈+', r'呵呵+', r'嘿嘿+',
-            r'请帮我.*测试', r'测试一下', r'随便问问',
-            r'^[\s\W]*$',  # 只有标点和空格
-        ]
-        
-        # 检查用户问题
-        user_lower = user_content.lower()
-        for pattern in exclusion_patterns:
-            if re.search(pattern, user_lower, re.IGNORECASE):
-                return False
-        
-        # 检查AI回答是否有技术内容
-        technical_indicators = [
-            '```',  # 代码块
-            '##',   # 二级标题
-            '###',  # 三级标题
-            '1.', '2.', '3.',  # 编号列表
-            '- ', '* ',  # 无序列表
-            '步骤', '方法', '配置', '代码', '示例',
-            '参数', '函数', '变量', '类', '对象',
-            '安装', '部署', '配置', '优化', '调试',
-            'python', 'java', 'javascript', 'html', 'css',
-            'docker', 'kubernetes', 'database', 'api',
-        ]
-        
-        ai_lower = ai_content.lower()
-        for indicator in technical_indicators:
-            if indicator.lower() in ai_lower:
-                return True
-        
-        # 较长的回答通常有内容
-        return len(ai_content.strip()) > 100
-    
-    def _clean_content(self, content: str) -> str:
-        """清理内容"""
-        if not content:
-            return ""
-        
-        # 移除多余的空行
-        lines = [line.rstrip() for line in content.split('\n')]
-        cleaned_lines = []
-        
-        for i, line in enumerate(lines):
-            if line.strip() or (i > 0 and lines[i-1].strip()):
-                cleaned_lines.append(line)
-        
-        # 合并连续空行
-        result_lines = []
-        for line in cleaned_lines:
-            if line.strip() or (not result_lines or result_lines[-1].strip()):
-                result_lines.append(line)
-        
-        return '\n'.join(result_lines).strip()
+        return _is_technical_text(user_content, ai_content)
     
-    def _count_valid_rounds(self, rounds: List[Dict[str, Any]]) -> int:
-        """计算有效轮次数量"""
-        return sum(1 for round_data in rounds if self._is_valid_round(round_data))
\ No newline at end of file
+    def _is_excluded_question(self, user_content: str) -> bool:
+        """用户问题是否为空或属于寒暄/测试等非技术内容"""
+        return _is_excluded_text(user_content)
+
+
+# 并行解析时工作进程内的解析器（进程启动时创建一次）
+_worker_parser = None
+
+
+def _init_parse_worker(config):
+    """工作进程初始化：重建日志后台线程并创建解析器"""
+    global _worker_parser
+    get_logger(config)  # fork出的子进程中没有父进程的日志监听线程
+    _worker_parser = DeepSeekParser(config)
+
+
+def _parse_file_in_worker(file_path: str) -> Union[Dict[str, Any], Exception]:
+    """在工作进程中读取并解析单个文件，异常作为结果返回以免中断其他文件"""
+    try:
+        html_content = FileOperations.read_file(file_path)
+        if not html_content:
+            raise ValueError('文件内容为空')
+        return _worker_parser.parse_html(html_content)
+    except Exception as e:
+        return e
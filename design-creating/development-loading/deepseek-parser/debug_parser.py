@@ -17,28 +17,41 @@ from core.content_formatter import ContentFormatter
 from outputs.optimized_markdown import OptimizedMarkdownWriter
 
 
-def debug_single_file(file_path):
-    """调试单个文件解析过程"""
+def load_debug_config():
+    """加载配置并开启详细日志"""
+    config = FileOperations.load_config('config.yaml')
+    
+    # 设置详细日志
+    config['logging']['level'] = 'DEBUG'
+    get_logger(config)
+    return config
+
+
+def debug_single_file(file_path, config=None, parser=None):
+    """
+    调试单个文件解析过程
+    
+    调试多个文件时可传入同一份配置和解析器，避免每个文件都重新初始化。
+    """
     print(f"\n{'='*60}")
     print(f"调试文件: {file_path}")
     print(f"{'='*60}")
     
     # 加载配置
-    config = FileOperations.load_config('config.yaml')
-    
-    # 设置详细日志
-    config['logging']['level'] = 'DEBUG'
-    logger = get_logger(config)
+    if config is None:
+        config = load_debug_config()
     
     try:
         # 步骤1: 读取文件
         print("\n1. 读取文件...")
+        # 与main.py和批量处理使用同一读取路径（UTF-8失败时回退GBK）
         html_content = FileOperations.read_file(file_path)
-        print(f"   文件大小: {len(html_content)} 字节")
+        print(f"   文件长度: {len(html_content)} 字符")
         
         # 步骤2: 解析HTML
         print("\n2. 解析HTML...")
-        parser = DeepSeekParser(config)
+        if parser is None:
+            parser = DeepSeekParser(config)
         parsed_data = parser.parse_html(html_content)
         print(f"   解析到的轮次: {len(parsed_data.get('rounds', []))}")
         
@@ -134,6 +147,14 @@ def debug_single_file(file_path):
 
 def main():
     """主函数"""
+    # 命令行指定了文件时逐个调试，共用同一个解析器
+    if len(sys.argv) > 1:
+        config = load_debug_config()
+        parser = DeepSeekParser(config)
+        for file_path in sys.argv[1:]:
+            debug_single_file(file_path, config, parser)
+        return
+    
     # 检查文件路径
     file_path = "./html_conversations/example_conversation.html"
     
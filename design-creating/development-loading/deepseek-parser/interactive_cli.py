@@ -4,47 +4,42 @@ DeepSeek HTML解析器 - 增强交互式命令行界面
 """
 import os
 import sys
-import time
-import shutil
-from pathlib import Path
+import json
+import cProfile
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import traceback
+from collections import deque
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils.file_ops import FileOperations
 from utils.logger import get_logger
-from core.deepseek_parser import DeepSeekParser
-from core.conversation_builder import ConversationBuilder
-from core.content_formatter import ContentFormatter
 from outputs.optimized_markdown import OptimizedMarkdownWriter
 from outputs.simple_markdown import SimpleMarkdownWriter
 from batch.processor import BatchProcessor
 
-try:
-    from colorama import init, Fore, Back, Style, Cursor
-    from pyfiglet import Figlet
-    from tqdm import tqdm
-    import inquirer
-    from rich.console import Console
-    from rich.table import Table
-    from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
-    from rich.panel import Panel
-    from rich.layout import Layout
-    from rich.text import Text
-    from rich.prompt import Prompt, Confirm, IntPrompt
-    from rich.syntax import Syntax
-    from rich.markdown import Markdown
-    HAS_RICH = True
-except ImportError:
-    print("正在安装增强依赖...")
-    import subprocess
+from colorama import init, Fore, Style
+
+# 增强界面依赖（rich、pyfiglet、inquirer、tqdm）在首次创建界面时才导入，
+# 仅导入本模块（如在其他脚本中复用批量处理函数）时不承担其加载开销
+ENHANCED_UI_PACKAGES = ["pyfiglet", "tqdm", "inquirer", "rich"]
+HAS_RICH = False
+_enhanced_ui_loaded = False
+
+
+def _load_enhanced_ui() -> bool:
+    """导入增强界面依赖并绑定为模块全局名，返回是否可用（只在首次调用时导入）"""
+    global HAS_RICH, _enhanced_ui_loaded
+    global Figlet, tqdm, inquirer, Console, Table, Progress, SpinnerColumn, TextColumn
+    global BarColumn, TimeElapsedColumn, Panel, Layout, Text, Prompt, Confirm, IntPrompt
+    global Syntax, Markdown
+    if _enhanced_ui_loaded:
+        return HAS_RICH
+    _enhanced_ui_loaded = True
+    
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", 
-                             "colorama", "pyfiglet", "tqdm", "inquirer", "rich"])
-        from colorama import init, Fore, Back, Style, Cursor
         from pyfiglet import Figlet
         from tqdm import tqdm
         import inquirer
@@ -58,14 +53,189 @@ except ImportError:
         from rich.syntax import Syntax
         from rich.markdown import Markdown
         HAS_RICH = True
-        print("增强依赖安装完成！")
-    except:
+    except ImportError:
         HAS_RICH = False
-        print("无法安装增强依赖，将使用基础界面")
+    return HAS_RICH
+
+
+def install_enhanced_dependencies() -> bool:
+    """安装增强界面依赖（需显式调用，导入模块时不会自动安装），返回安装后是否可用"""
+    import importlib
+    import subprocess
+    
+    print("正在安装增强依赖...")
+    try:
+        subprocess.check_call([sys.executable, "-m", "pip", "install", *ENHANCED_UI_PACKAGES])
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"无法安装增强依赖: {e}")
+        return False
+    
+    global _enhanced_ui_loaded
+    importlib.invalidate_caches()
+    _enhanced_ui_loaded = False
+    if _load_enhanced_ui():
+        print("增强依赖安装完成！")
+    return HAS_RICH
 
 # 初始化colorama
 init(autoreset=True)
 
+# 批量处理结果只在内存中保留最近的若干条，完整明细逐条写入输出目录下的 batch_<会话ID>.jsonl
+BATCH_RECENT_DETAILS = 100
+
+# 批量预筛选读取的文件头字节数（在其中查找 batch.admission_markers）
+ADMISSION_HEAD_BYTES = 4096
+
+# 基础界面批量进度条：预先生成全部进度条字符串（0~满格），每处理若干文件刷新一次输出
+BATCH_PROGRESS_BAR_LENGTH = 50
+_BATCH_PROGRESS_BARS = tuple(
+    f"[{Fore.CYAN}{'█' * i}{Fore.WHITE}{'░' * (BATCH_PROGRESS_BAR_LENGTH - i)}{Style.RESET_ALL}]"
+    for i in range(BATCH_PROGRESS_BAR_LENGTH + 1)
+)
+BATCH_PROGRESS_FLUSH_EVERY = 10
+
+
+# 消息级别对应的颜色和图标
+MESSAGE_STYLES = {
+    'success': ('green', '✅'),
+    'error': ('red', '❌'),
+    'warning': ('yellow', '⚠️'),
+    'info': ('cyan', 'ℹ️')
+}
+
+# 主菜单选项：(编号, 名称, 描述)
+MAIN_MENU_OPTIONS = [
+    ("1", "📄 解析单个HTML文件", "处理单个DeepSeek对话HTML文件"),
+    ("2", "📁 批量处理HTML文件", "处理目录下的所有HTML文件"),
+    ("3", "🗂️  目录管理", "管理输入/输出目录和文件"),
+    ("4", "⚙️  配置管理", "查看和修改解析配置"),
+    ("5", "📊 查看统计", "查看处理统计信息"),
+    ("6", "📚 使用教程", "查看详细使用教程"),
+    ("7", "ℹ️  关于", "关于本程序和版本信息"),
+    ("0", "🚪 退出程序", "安全退出程序")
+]
+
+
+class PlainUI:
+    """基础文本界面（colorama）"""
+    
+    def welcome(self, session_id: str):
+        """显示欢迎信息"""
+        # 基础文本界面
+        print("\n" + "="*60)
+        print(Fore.CYAN + "      DeepSeek HTML 解析器 - 增强交互版      " + Style.RESET_ALL)
+        print("="*60)
+        print(Fore.YELLOW + "\n欢迎使用 DeepSeek HTML 解析器！" + Style.RESET_ALL)
+        print(Fore.GREEN + "这是一个强大的工具，专门用于将DeepSeek对话HTML转换为优化Markdown格式。" + Style.RESET_ALL)
+        print(Fore.WHITE + f"\n会话ID: {session_id}" + Style.RESET_ALL)
+        print(Fore.WHITE + f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}" + Style.RESET_ALL)
+        print("\n" + "="*60)
+    
+    def main_menu(self, options: List[Tuple[str, str, str]]) -> str:
+        """显示主菜单并返回用户选择的编号"""
+        print(Fore.CYAN + "\n" + "="*60 + Style.RESET_ALL)
+        print(Fore.YELLOW + "                    主菜单                    " + Style.RESET_ALL)
+        print(Fore.CYAN + "="*60 + Style.RESET_ALL)
+        for option, name, _ in options:
+            color = Fore.RED if option == '0' else Fore.GREEN
+            print(color + f"{option}. {name}" + Style.RESET_ALL)
+        print(Fore.CYAN + "="*60 + Style.RESET_ALL)
+        
+        choices = [option for option, _, _ in options]
+        while True:
+            choice = input(Fore.YELLOW + "\n请选择操作 (输入数字 0-7): " + Style.RESET_ALL).strip()
+            if choice in choices:
+                return choice
+            else:
+                print(Fore.RED + "无效选项，请输入 0-7 之间的数字" + Style.RESET_ALL)
+    
+    def mode_panel(self, title: str, description: List[str]):
+        """显示模式说明"""
+        print(Fore.YELLOW + "\n" + "="*60 + Style.RESET_ALL)
+        print(Fore.YELLOW + f"              {title}              " + Style.RESET_ALL)
+        print(Fore.YELLOW + "="*60 + Style.RESET_ALL)
+        for i, line in enumerate(description):
+            print(Fore.GREEN + ("\n" if i == 0 else "") + line + Style.RESET_ALL)
+
+
+class RichUI:
+    """富文本界面（rich）"""
+    
+    def __init__(self, console):
+        self.console = console
+    
+    def welcome(self, session_id: str):
+        """显示欢迎信息"""
+        # 使用富文本显示欢迎界面
+        self.console.print("\n")
+        
+        # ASCII艺术标题
+        try:
+            f = Figlet(font='slant')
+            ascii_art = f.renderText('DeepSeek Parser')
+            self.console.print(f"[bold cyan]{ascii_art}[/bold cyan]")
+        except:
+            self.console.print("[bold cyan]" + "="*60 + "[/bold cyan]")
+            self.console.print("[bold cyan]          DeepSeek HTML 解析器 - 增强交互版          [/bold cyan]")
+            self.console.print("[bold cyan]" + "="*60 + "[/bold cyan]")
+        
+        # 欢迎信息
+        welcome_text = Text()
+        welcome_text.append("\n欢迎使用 DeepSeek HTML 解析器！\n", style="bold yellow")
+        welcome_text.append("这是一个强大的工具，专门用于将DeepSeek对话HTML转换为优化Markdown格式。\n", style="green")
+        welcome_text.append(f"会话ID: {session_id}\n", style="dim")
+        welcome_text.append(f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n", style="dim")
+        
+        self.console.print(Panel(
+            welcome_text,
+            title="[bold]欢迎信息[/bold]",
+            border_style="cyan",
+            padding=(1, 2)
+        ))
+        
+        # 快速提示
+        tips = [
+            "💡 提示: 使用数字键选择菜单选项",
+            "💡 提示: 按 Ctrl+C 可以中断当前操作",
+            "💡 提示: 配置保存在 config.yaml 文件中",
+            "💡 提示: 日志文件: deepseek_parser.log"
+        ]
+        
+        for tip in tips:
+            self.console.print(f"[dim]{tip}[/dim]")
+        
+        self.console.print("\n")
+    
+    def main_menu(self, options: List[Tuple[str, str, str]]) -> str:
+        """显示主菜单并返回用户选择的编号"""
+        # 创建菜单表格
+        table = Table(title="主菜单", show_header=False, box=None)
+        table.add_column("选项", style="cyan", width=4)
+        table.add_column("功能", style="yellow", width=25)
+        table.add_column("描述", style="green")
+        
+        for option, name, desc in options:
+            table.add_row(f"[bold]{option}[/bold]", name, desc)
+        
+        self.console.print("\n")
+        self.console.print(table)
+        self.console.print("\n")
+        
+        # 获取用户选择
+        return Prompt.ask(
+            "[bold yellow]请选择操作 (输入数字)[/bold yellow]",
+            choices=sorted(option for option, _, _ in options),
+            show_choices=False
+        )
+    
+    def mode_panel(self, title: str, description: List[str]):
+        """显示模式说明"""
+        self.console.print(Panel(
+            f"[bold yellow]{title}[/bold yellow]\n\n" + "\n".join(description),
+            title="模式说明",
+            border_style="yellow"
+        ))
+
 
 class EnhancedInteractiveCLI:
     """增强的交互式命令行界面"""
@@ -74,14 +244,17 @@ class EnhancedInteractiveCLI:
         self.config = FileOperations.load_config(config_path or 'config.yaml')
         self.logger = get_logger(self.config)
         
-        # 初始化组件
-        self.parser = DeepSeekParser(self.config)
-        self.builder = ConversationBuilder(self.config)
-        self.formatter = ContentFormatter(self.config)
+        # 初始化组件（与批量处理器共用，单文件和批量处理的对话ID连续编号）
         self.batch_processor = BatchProcessor(self.config)
+        self.parser = self.batch_processor.parser
+        self.builder = self.batch_processor.builder
+        self.formatter = self.batch_processor.formatter
         
-        # 初始化富文本控制台
+        # 初始化富文本控制台（未安装增强依赖时使用基础界面）
+        if not _load_enhanced_ui():
+            print("未安装增强依赖，将使用基础界面（可调用 install_enhanced_dependencies() 安装）")
         self.console = Console() if HAS_RICH else None
+        self.ui = RichUI(self.console) if HAS_RICH else PlainUI()
         
         # 状态变量
         self.current_mode = None
@@ -121,7 +294,7 @@ class EnhancedInteractiveCLI:
                     elif choice == '6':  # 使用教程
                         self._show_tutorial()
                     elif choice == '7':  # 关于
-                        self._show_about()
+                        self._show_unavailable("关于")
                     elif choice == '0':  # 退出
                         if self._confirm_exit():
                             break
@@ -146,136 +319,20 @@ class EnhancedInteractiveCLI:
     def _show_welcome(self):
         """显示欢迎界面"""
         self._clear_screen()
-        
-        if HAS_RICH and self.console:
-            # 使用富文本显示欢迎界面
-            self.console.print("\n")
-            
-            # ASCII艺术标题
-            try:
-                f = Figlet(font='slant')
-                ascii_art = f.renderText('DeepSeek Parser')
-                self.console.print(f"[bold cyan]{ascii_art}[/bold cyan]")
-            except:
-                self.console.print("[bold cyan]" + "="*60 + "[/bold cyan]")
-                self.console.print("[bold cyan]          DeepSeek HTML 解析器 - 增强交互版          [/bold cyan]")
-                self.console.print("[bold cyan]" + "="*60 + "[/bold cyan]")
-            
-            # 欢迎信息
-            welcome_text = Text()
-            welcome_text.append("\n欢迎使用 DeepSeek HTML 解析器！\n", style="bold yellow")
-            welcome_text.append("这是一个强大的工具，专门用于将DeepSeek对话HTML转换为优化Markdown格式。\n", style="green")
-            welcome_text.append(f"会话ID: {self.session_id}\n", style="dim")
-            welcome_text.append(f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n", style="dim")
-            
-            self.console.print(Panel(
-                welcome_text,
-                title="[bold]欢迎信息[/bold]",
-                border_style="cyan",
-                padding=(1, 2)
-            ))
-            
-            # 快速提示
-            tips = [
-                "💡 提示: 使用数字键选择菜单选项",
-                "💡 提示: 按 Ctrl+C 可以中断当前操作",
-                "💡 提示: 配置保存在 config.yaml 文件中",
-                "💡 提示: 日志文件: deepseek_parser.log"
-            ]
-            
-            for tip in tips:
-                self.console.print(f"[dim]{tip}[/dim]")
-            
-            self.console.print("\n")
-        else:
-            # 基础文本界面
-            print("\n" + "="*60)
-            print(Fore.CYAN + "      DeepSeek HTML 解析器 - 增强交互版      " + Style.RESET_ALL)
-            print("="*60)
-            print(Fore.YELLOW + "\n欢迎使用 DeepSeek HTML 解析器！" + Style.RESET_ALL)
-            print(Fore.GREEN + "这是一个强大的工具，专门用于将DeepSeek对话HTML转换为优化Markdown格式。" + Style.RESET_ALL)
-            print(Fore.WHITE + f"\n会话ID: {self.session_id}" + Style.RESET_ALL)
-            print(Fore.WHITE + f"时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}" + Style.RESET_ALL)
-            print("\n" + "="*60)
+        self.ui.welcome(self.session_id)
     
     def _show_main_menu(self) -> str:
         """显示主菜单并获取用户选择"""
-        if HAS_RICH and self.console:
-            # 富文本菜单
-            menu_options = [
-                ("1", "📄 解析单个HTML文件", "处理单个DeepSeek对话HTML文件"),
-                ("2", "📁 批量处理HTML文件", "处理目录下的所有HTML文件"),
-                ("3", "🗂️  目录管理", "管理输入/输出目录和文件"),
-                ("4", "⚙️  配置管理", "查看和修改解析配置"),
-                ("5", "📊 查看统计", "查看处理统计信息"),
-                ("6", "📚 使用教程", "查看详细使用教程"),
-                ("7", "ℹ️  关于", "关于本程序和版本信息"),
-                ("0", "🚪 退出程序", "安全退出程序")
-            ]
-            
-            # 创建菜单表格
-            table = Table(title="主菜单", show_header=False, box=None)
-            table.add_column("选项", style="cyan", width=4)
-            table.add_column("功能", style="yellow", width=25)
-            table.add_column("描述", style="green")
-            
-            for option, name, desc in menu_options:
-                table.add_row(f"[bold]{option}[/bold]", name, desc)
-            
-            self.console.print("\n")
-            self.console.print(table)
-            self.console.print("\n")
-            
-            # 获取用户选择
-            while True:
-                choice = Prompt.ask(
-                    "[bold yellow]请选择操作 (输入数字)[/bold yellow]",
-                    choices=['0', '1', '2', '3', '4', '5', '6', '7'],
-                    show_choices=False
-                )
-                return choice
-        
-        else:
-            # 基础文本菜单
-            print(Fore.CYAN + "\n" + "="*60 + Style.RESET_ALL)
-            print(Fore.YELLOW + "                    主菜单                    " + Style.RESET_ALL)
-            print(Fore.CYAN + "="*60 + Style.RESET_ALL)
-            print(Fore.GREEN + "1. 📄 解析单个HTML文件" + Style.RESET_ALL)
-            print(Fore.GREEN + "2. 📁 批量处理HTML文件" + Style.RESET_ALL)
-            print(Fore.GREEN + "3. 🗂️  目录管理" + Style.RESET_ALL)
-            print(Fore.GREEN + "4. ⚙️  配置管理" + Style.RESET_ALL)
-            print(Fore.GREEN + "5. 📊 查看统计" + Style.RESET_ALL)
-            print(Fore.GREEN + "6. 📚 使用教程" + Style.RESET_ALL)
-            print(Fore.GREEN + "7. ℹ️  关于" + Style.RESET_ALL)
-            print(Fore.RED + "0. 🚪 退出程序" + Style.RESET_ALL)
-            print(Fore.CYAN + "="*60 + Style.RESET_ALL)
-            
-            while True:
-                choice = input(Fore.YELLOW + "\n请选择操作 (输入数字 0-7): " + Style.RESET_ALL).strip()
-                if choice in ['0', '1', '2', '3', '4', '5', '6', '7']:
-                    return choice
-                else:
-                    print(Fore.RED + "无效选项，请输入 0-7 之间的数字" + Style.RESET_ALL)
+        return self.ui.main_menu(MAIN_MENU_OPTIONS)
     
     def _handle_single_file(self):
         """处理单个文件"""
         self._clear_screen()
         
-        if HAS_RICH and self.console:
-            self.console.print(Panel(
-                "[bold yellow]📄 单个文件解析模式[/bold yellow]\n\n"
-                "在此模式下，您可以处理单个DeepSeek对话HTML文件，\n"
-                "并将其转换为优化格式的Markdown文档。",
-                title="模式说明",
-                border_style="yellow"
-            ))
-        
-        else:
-            print(Fore.YELLOW + "\n" + "="*60 + Style.RESET_ALL)
-            print(Fore.YELLOW + "              📄 单个文件解析模式              " + Style.RESET_ALL)
-            print(Fore.YELLOW + "="*60 + Style.RESET_ALL)
-            print(Fore.GREEN + "\n在此模式下，您可以处理单个DeepSeek对话HTML文件，" + Style.RESET_ALL)
-            print(Fore.GREEN + "并将其转换为优化格式的Markdown文档。" + Style.RESET_ALL)
+        self.ui.mode_panel("📄 单个文件解析模式", [
+            "在此模式下，您可以处理单个DeepSeek对话HTML文件，",
+            "并将其转换为优化格式的Markdown文档。"
+        ])
         
         # 获取输入文件路径
         input_file = self._ask_for_file("请输入HTML文件路径")
@@ -302,6 +359,9 @@ class EnhancedInteractiveCLI:
             default=0
         )
         
+        # 自动生成时预先占用的输出文件（未成功写入时删除）
+        reserved_file = None
+        
         if output_choice == 1:
             output_file = self._ask_for_path("请输入输出文件路径", is_file=True)
             if not output_file:
@@ -312,12 +372,9 @@ class EnhancedInteractiveCLI:
             output_dir = self.config.get('paths', {}).get('output_dir', '.')
             os.makedirs(output_dir, exist_ok=True)
             
-            # 生成不重复的文件名
-            counter = 1
-            output_file = os.path.join(output_dir, f"{base_name}.md")
-            while os.path.exists(output_file):
-                output_file = os.path.join(output_dir, f"{base_name}_{counter}.md")
-                counter += 1
+            # 以独占方式创建不重复的文件名
+            output_file = FileOperations.reserve_unique_file(output_dir, base_name, '.md')
+            reserved_file = output_file
         
         # 显示处理配置摘要
         self._show_processing_summary({
@@ -329,6 +386,8 @@ class EnhancedInteractiveCLI:
         
         # 确认开始处理
         if not self._ask_confirmation("是否开始处理？"):
+            if reserved_file:
+                os.remove(reserved_file)
             self._show_message("已取消处理", "info")
             return
         
@@ -350,25 +409,14 @@ class EnhancedInteractiveCLI:
                 self._show_message("未解析到对话轮次", "warning")
                 return
             
-            # 构建对话
-            self._show_progress("正在构建对话结构...", 50)
-            conversation = self.builder.build(parsed_data)
+            # 构建对话（同时格式化内容）
+            self._show_progress("正在构建并格式化对话...", 50)
+            conversation = self.builder.build(parsed_data, formatter=self.formatter)
             
             if not conversation.get('rounds'):
                 self._show_message("未构建出有效对话", "warning")
                 return
             
-            # 格式化内容
-            self._show_progress("正在格式化内容...", 75)
-            for round_data in conversation['rounds']:
-                # 格式化用户内容
-                user_content = round_data['user']['content']
-                round_data['user']['content'] = self.formatter.format_content(user_content, 'user')
-                
-                # 格式化AI内容
-                ai_content = round_data['ai']['content']
-                round_data['ai']['content'] = self.formatter.format_content(ai_content, 'ai')
-            
             # 选择输出格式
             if format_type == 'simple':
                 writer = SimpleMarkdownWriter(self.config)
@@ -377,7 +425,8 @@ class EnhancedInteractiveCLI:
             
             # 写入Markdown
             self._show_progress("正在生成Markdown文档...", 90)
-            markdown_content = writer.write(conversation, output_file)
+            written_bytes = writer.write_to_file(conversation, output_file)
+            reserved_file = None
             
             # 完成
             self._show_progress("处理完成！", 100)
@@ -388,7 +437,7 @@ class EnhancedInteractiveCLI:
                 '对话ID': conversation.get('dialog_id', '未知'),
                 '有效轮次': len(conversation['rounds']),
                 '输出文件': output_file,
-                '文件大小': f"{len(markdown_content) / 1024:.1f} KB",
+                '文件大小': f"{written_bytes / 1024:.1f} KB",
                 '生成时间': datetime.now().strftime('%H:%M:%S')
             })
             
@@ -396,38 +445,24 @@ class EnhancedInteractiveCLI:
             self.stats['files_processed'] += 1
             self.stats['total_rounds'] += len(conversation['rounds'])
             
-            # 询问是否查看文件
-            if self._ask_confirmation("是否查看生成的Markdown文件？"):
-                self._preview_file(output_file)
-            
-            # 询问是否打开目录
-            if self._ask_confirmation("是否打开输出目录？"):
-                self._open_directory(os.path.dirname(output_file))
-            
         except Exception as e:
             self._show_message(f"处理失败: {str(e)}", "error")
             self.logger.error(f"单文件处理失败: {e}")
             self.logger.debug(traceback.format_exc())
+        
+        finally:
+            # 未写入内容时删除预先占用的空文件
+            if reserved_file and os.path.exists(reserved_file):
+                os.remove(reserved_file)
     
     def _handle_batch_processing(self):
         """处理批量处理"""
         self._clear_screen()
         
-        if HAS_RICH and self.console:
-            self.console.print(Panel(
-                "[bold yellow]📁 批量处理模式[/bold yellow]\n\n"
-                "在此模式下，您可以批量处理目录下的所有DeepSeek对话HTML文件，\n"
-                "自动转换为优化格式的Markdown文档并保存到知识库。",
-                title="模式说明",
-                border_style="yellow"
-            ))
-        
-        else:
-            print(Fore.YELLOW + "\n" + "="*60 + Style.RESET_ALL)
-            print(Fore.YELLOW + "              📁 批量处理模式              " + Style.RESET_ALL)
-            print(Fore.YELLOW + "="*60 + Style.RESET_ALL)
-            print(Fore.GREEN + "\n在此模式下，您可以批量处理目录下的所有DeepSeek对话HTML文件，" + Style.RESET_ALL)
-            print(Fore.GREEN + "自动转换为优化格式的Markdown文档并保存到知识库。" + Style.RESET_ALL)
+        self.ui.mode_panel("📁 批量处理模式", [
+            "在此模式下，您可以批量处理目录下的所有DeepSeek对话HTML文件，",
+            "自动转换为优化格式的Markdown文档并保存到知识库。"
+        ])
         
         # 获取输入目录
         input_dir = self._ask_for_directory("请输入HTML文件目录路径")
@@ -442,11 +477,7 @@ class EnhancedInteractiveCLI:
             if self._ask_confirmation("是否创建该目录？"):
                 try:
                     os.makedirs(input_dir, exist_ok=True)
-                    self._show_message(f"目录已创建: {input_dir}", "success")
-                    
-                    # 询问是否查看目录
-                    if self._ask_confirmation("是否打开目录添加文件？"):
-                        self._open_directory(input_dir)
+                    self._show_message(f"目录已创建: {input_dir}，请将HTML文件放入后重新运行", "success")
                     return
                 except Exception as e:
                     self._show_message(f"创建目录失败: {str(e)}", "error")
@@ -492,18 +523,57 @@ class EnhancedInteractiveCLI:
         
         # 扫描文件
         self._show_progress("正在扫描目录...", 0)
-        html_files = FileOperations.find_files(input_dir, ['.html', '.htm'])
+        # 扫描时一并取得文件大小，汇总和测试模式无需再逐个stat
+        file_sizes = dict(FileOperations.find_files_with_sizes(input_dir, ['.html', '.htm']))
+        html_files = list(file_sizes)
         
         if not html_files:
             self._show_message(f"在目录中未找到HTML文件: {input_dir}", "warning")
-            
-            # 询问是否查看示例
-            if self._ask_confirmation("是否查看示例文件？"):
-                self._show_example_structure()
             return
         
+        # 预筛选：过小或文件头不含标记的文件不进入解析流程
+        batch_config = self.config.get('batch', {})
+        min_bytes = batch_config.get('admission_min_bytes', 0)
+        markers = [m.lower().encode('utf-8') for m in batch_config.get('admission_markers') or []]
+        if min_bytes or markers:
+            admitted_files = [
+                file_path for file_path in html_files
+                if self._passes_admission(file_path, file_sizes[file_path], min_bytes, markers)
+            ]
+            rejected = len(html_files) - len(admitted_files)
+            if rejected:
+                self.logger.info(f"预筛选排除 {rejected} 个文件")
+            html_files = admitted_files
+            summary['预筛选排除'] = rejected
+            
+            if not html_files:
+                self._show_message("没有通过预筛选的HTML文件", "warning")
+                return
+        
+        # 处理清单及各文件的 [修改时间, 大小]，处理成功后写回清单
+        manifest = {}
+        file_keys = {}
+        skipped = 0
+        if not test_mode:
+            manifest = self.batch_processor.load_manifest(output_dir)
+            file_keys = {file_path: self.batch_processor.file_change_key(file_path) for file_path in html_files}
+        
+        if incremental:
+            # 增量模式：跳过清单中记录过、之后未修改且输出仍存在的文件
+            pending_files = [
+                file_path for file_path in html_files
+                if not self.batch_processor.is_unchanged(manifest, file_path, file_keys[file_path])
+            ]
+            skipped = len(html_files) - len(pending_files)
+            html_files = pending_files
+            summary['跳过未变化文件'] = skipped
+            
+            if not html_files:
+                self._show_message("所有文件均未变化，无需处理", "info")
+                return
+        
         summary['文件数量'] = len(html_files)
-        summary['总大小'] = f"{sum(os.path.getsize(f) for f in html_files) / 1024:.1f} KB"
+        summary['总大小'] = f"{sum(file_sizes[f] for f in html_files) / 1024:.1f} KB"
         
         self._show_processing_summary(summary)
         
@@ -513,9 +583,18 @@ class EnhancedInteractiveCLI:
             return
         
         # 开始批量处理
+        profiler = None
+        details_stream = None
         try:
             self.stats['start_time'] = datetime.now()
             
+            if not test_mode:
+                # 每处理完一个文件即写入一行明细，中断时已处理部分的明细仍然保留
+                batch_id, details_file, details_stream = self._open_batch_details(output_dir)
+            
+            if self.config.get('batch', {}).get('profile') and not test_mode:
+                profiler = self._start_batch_profiler()
+            
             if HAS_RICH and self.console and not test_mode:
                 # 使用富文本进度条
                 with Progress(
@@ -529,94 +608,54 @@ class EnhancedInteractiveCLI:
                     
                     task = progress.add_task("[cyan]批量处理中...", total=len(html_files))
                     
-                    results = {
-                        'total_files': len(html_files),
-                        'success': 0,
-                        'failed': 0,
-                        'failed_files': [],
-                        'details': []
-                    }
+                    results = self._new_batch_results(len(html_files), skipped, details_file)
                     
-                    for i, file_path in enumerate(html_files):
-                        try:
-                            # 更新进度描述
-                            progress.update(task, description=f"[cyan]处理: {os.path.basename(file_path)[:30]}...")
-                            
-                            if test_mode:
-                                # 测试模式：只检查不处理
-                                results['details'].append({
-                                    'file': file_path,
-                                    'status': 'checked',
-                                    'size': os.path.getsize(file_path)
-                                })
-                                results['success'] += 1
-                            else:
-                                # 实际处理
-                                file_result = self._process_single_file_in_batch(
-                                    file_path, output_dir, overwrite
-                                )
-                                
-                                if file_result['success']:
-                                    results['success'] += 1
-                                else:
-                                    results['failed'] += 1
-                                    results['failed_files'].append(file_path)
-                                
-                                results['details'].append(file_result)
-                            
-                            # 更新进度
-                            progress.update(task, advance=1)
-                            
-                        except Exception as e:
-                            results['failed'] += 1
-                            results['failed_files'].append(file_path)
-                            self.logger.error(f"处理文件失败 {file_path}: {e}")
-                            progress.update(task, advance=1)
+                    for file_path, file_result in self.batch_processor.iter_results(html_files, output_dir, overwrite):
+                        # 更新进度描述
+                        progress.update(task, description=f"[cyan]处理: {os.path.basename(file_path)[:30]}...")
+                        
+                        self._record_batch_result(results, file_path, file_result,
+                                                  details_stream, manifest, file_keys)
+                        
+                        # 更新进度
+                        progress.update(task, advance=1)
                     
                     # 完成进度条
                     progress.update(task, description="[green]批量处理完成！")
                     
             else:
                 # 基础进度条或测试模式
-                results = {
-                    'total_files': len(html_files),
-                    'success': 0,
-                    'failed': 0,
-                    'failed_files': [],
-                    'details': []
-                }
+                results = self._new_batch_results(len(html_files), skipped,
+                                                  None if test_mode else details_file)
                 
                 print(Fore.CYAN + "\n开始批量处理..." + Style.RESET_ALL)
                 
-                for i, file_path in enumerate(html_files):
+                if test_mode:
+                    batch_results = ((file_path, None) for file_path in html_files)
+                else:
+                    batch_results = self.batch_processor.iter_results(html_files, output_dir, overwrite)
+                
+                for i, (file_path, file_result) in enumerate(batch_results):
                     try:
                         file_name = os.path.basename(file_path)
                         progress = (i + 1) / len(html_files) * 100
                         
-                        print(f"\r[{Fore.CYAN}{'█' * int(progress/2)}{Fore.WHITE}{'░' * (50 - int(progress/2))}{Style.RESET_ALL}] "
-                              f"{progress:.1f}% - 处理: {file_name[:40]}", end="")
+                        sys.stdout.write(f"\r{_BATCH_PROGRESS_BARS[int(progress/2)]} "
+                                         f"{progress:.1f}% - 处理: {file_name[:40]}")
+                        if (i + 1) % BATCH_PROGRESS_FLUSH_EVERY == 0 or i + 1 == len(html_files):
+                            sys.stdout.flush()
                         
                         if test_mode:
                             # 测试模式
                             results['details'].append({
                                 'file': file_path,
                                 'status': 'checked',
-                                'size': os.path.getsize(file_path)
+                                'size': file_sizes[file_path]
                             })
                             results['success'] += 1
                         else:
-                            # 实际处理
-                            file_result = self._process_single_file_in_batch(
-                                file_path, output_dir, overwrite
-                            )
-                            
-                            if file_result['success']:
-                                results['success'] += 1
-                            else:
-                                results['failed'] += 1
-                                results['failed_files'].append(file_path)
-                            
-                            results['details'].append(file_result)
+                            self._record_batch_result(results, file_path, file_result,
+                                                      details_stream, manifest, file_keys)
                         
                     except Exception as e:
                         results['failed'] += 1
@@ -630,192 +669,140 @@ class EnhancedInteractiveCLI:
             processing_time = (self.stats['end_time'] - self.stats['start_time']).total_seconds()
             results['processing_time'] = processing_time
             
+            if profiler:
+                profile_file = self._dump_batch_profile(profiler, output_dir, batch_id)
+                profiler = None
+                self._show_message(f"性能分析数据已保存: {profile_file}", "info")
+            
             # 更新统计
             self.stats['files_processed'] += results['success']
             
+            # 保存明细和处理清单（清单供之后的增量处理使用）
+            if not test_mode:
+                details_stream.close()
+                self.batch_processor.save_manifest(output_dir, manifest)
+            results['details'] = list(results['details'])
+            
             # 显示结果
             self._show_batch_results(results, test_mode)
             
             # 生成报告
             if not test_mode and results['total_files'] > 0:
                 if self._ask_confirmation("是否生成详细处理报告？"):
-                    report_file = self._generate_batch_report(results, output_dir)
+                    report_file = self._generate_batch_report(results, output_dir, batch_id)
                     self._show_message(f"报告已生成: {report_file}", "success")
             
-            # 询问是否查看输出目录
-            if results['success'] > 0 and self._ask_confirmation("是否打开输出目录？"):
-                self._open_directory(output_dir)
-            
         except Exception as e:
             self._show_message(f"批量处理失败: {str(e)}", "error")
             self.logger.error(f"批量处理失败: {e}")
             self.logger.debug(traceback.format_exc())
+        finally:
+            if profiler:
+                profiler.disable()
+            if details_stream:
+                details_stream.close()
     
-    def _process_single_file_in_batch(self, file_path: str, output_dir: str, overwrite: bool) -> Dict[str, Any]:
-        """在批量处理中处理单个文件"""
-        result = {
-            'file': file_path,
-            'success': False,
-            'error': None,
-            'processing_time': 0
-        }
-        
-        start_time = time.time()
+    def _open_batch_details(self, output_dir: str):
+        """
+        创建本次批量处理的明细文件，返回 (批次ID, 文件路径, 行缓冲的写入流)
         
-        try:
-            # 读取HTML文件
-            html_content = FileOperations.read_file(file_path)
-            
-            if not html_content:
-                result['error'] = '文件内容为空'
-                return result
-            
-            # 解析HTML
-            parsed_data = self.parser.parse_html(html_content)
-            
-            if not parsed_data.get('rounds'):
-                result['error'] = '未解析到对话轮次'
-                return result
-            
-            # 构建对话
-            conversation = self.builder.build(parsed_data)
-            
-            if not conversation.get('rounds'):
-                result['error'] = '未构建出有效对话'
-                return result
-            
-            # 格式化内容
-            for round_data in conversation['rounds']:
-                user_content = round_data['user']['content']
-                round_data['user']['content'] = self.formatter.format_content(user_content, 'user')
-                
-                ai_content = round_data['ai']['content']
-                round_data['ai']['content'] = self.formatter.format_content(ai_content, 'ai')
-            
-            # 生成输出文件名
-            output_filename = FileOperations.generate_output_filename(
-                conversation, 
-                output_dir,
-                '.md'
-            )
-            
-            output_file = os.path.join(output_dir, output_filename)
-            
-            # 检查文件是否已存在
-            if os.path.exists(output_file) and not overwrite:
-                # 生成新文件名
-                base_name, ext = os.path.splitext(output_filename)
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_filename = f"{base_name}_{timestamp}{ext}"
-                output_file = os.path.join(output_dir, output_filename)
-            
-            # 写入Markdown
-            writer = OptimizedMarkdownWriter(self.config)
-            markdown_content = writer.write(conversation, output_file)
-            
-            # 记录结果
-            result['success'] = True
-            result['output_file'] = output_file
-            result['dialog_id'] = conversation.get('dialog_id')
-            result['rounds'] = len(conversation['rounds'])
-            
-        except Exception as e:
-            result['error'] = str(e)
+        同一会话在同一输出目录多次批量处理时，明细文件依次加序号
+        （batch_<会话ID>.jsonl、batch_<会话ID>_1.jsonl ...），不覆盖之前的明细。
+        """
+        FileOperations.ensure_directory(output_dir)
+        details_file = FileOperations.reserve_unique_file(output_dir, f"batch_{self.session_id}", '.jsonl')
+        batch_id = os.path.splitext(os.path.basename(details_file))[0][len('batch_'):]
+        return batch_id, details_file, open(details_file, 'w', encoding='utf-8', buffering=1)
+    
+    @staticmethod
+    def _new_batch_results(total_files: int, skipped: int, details_file: Optional[str]) -> Dict[str, Any]:
+        """
+        创建批量处理结果
         
-        finally:
-            # 计算处理时间
-            end_time = time.time()
-            result['processing_time'] = end_time - start_time
+        有明细文件时内存中只保留最近BATCH_RECENT_DETAILS条明细（完整明细在文件中），
+        没有明细文件时（如测试模式）保留全部明细。
+        """
+        return {
+            'total_files': total_files,
+            'success': 0,
+            'failed': 0,
+            'skipped': skipped,
+            'failed_files': [],
+            'details': deque(maxlen=BATCH_RECENT_DETAILS) if details_file else [],
+            'details_file': details_file
+        }
+    
+    @staticmethod
+    def _record_batch_result(results: Dict[str, Any], file_path: str, file_result: Dict[str, Any],
+                             details_stream, manifest: Dict[str, List[Any]],
+                             file_keys: Dict[str, List[int]]):
+        """累计单个文件的处理结果，写入一行明细，处理成功的文件记入清单"""
+        if file_result['success']:
+            results['success'] += 1
+            manifest[os.path.abspath(file_path)] = file_keys[file_path] + [file_result['output_file']]
+        else:
+            results['failed'] += 1
+            results['failed_files'].append(file_path)
         
-        return result
+        results['details'].append(file_result)
+        # 明细流为行缓冲，整行写入后立即落盘
+        details_stream.write(json.dumps(file_result, ensure_ascii=False, default=str) + '\n')
+    
+    def _start_batch_profiler(self) -> cProfile.Profile:
+        """开始记录批量处理的性能数据（只覆盖主进程）"""
+        workers = self.config.get('batch', {}).get('workers') or os.cpu_count() or 1
+        if workers > 1:
+            self.logger.warning("性能分析只覆盖主进程，工作进程中的解析耗时不会计入；"
+                                "请将 batch.workers 设为 1 以获得完整数据")
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    
+    def _dump_batch_profile(self, profiler: cProfile.Profile, output_dir: str, batch_id: str) -> str:
+        """停止记录并保存性能数据，返回文件路径（可用 python -m pstats 或 snakeviz 查看）"""
+        profiler.disable()
+        # 与本次批量处理的明细文件同名（batch_<批次ID>），多次批量处理不会互相覆盖
+        profile_file = os.path.join(output_dir, f"batch_{batch_id}.prof")
+        profiler.dump_stats(profile_file)
+        self.logger.info(f"性能分析数据已保存: {profile_file}")
+        return profile_file
+    
+    @staticmethod
+    def _passes_admission(file_path: str, size: int, min_bytes: int, markers: List[bytes]) -> bool:
+        """文件大小不低于下限，且文件头（不区分大小写）包含任一标记"""
+        if size < min_bytes:
+            return False
+        if not markers:
+            return True
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(ADMISSION_HEAD_BYTES).lower()
+        except OSError:
+            # 读取失败的文件交给后续流程记录错误
+            return True
+        return any(marker in head for marker in markers)
     
     def _handle_directory_management(self):
         """处理目录管理"""
         self._clear_screen()
         
-        if HAS_RICH and self.console:
-            self.console.print(Panel(
-                "[bold yellow]🗂️  目录管理[/bold yellow]\n\n"
-                "在此模式下，您可以管理输入/输出目录，查看文件列表，\n"
-                "清理旧文件，以及检查目录结构。",
-                title="模式说明",
-                border_style="yellow"
-            ))
-        
-        else:
-            print(Fore.YELLOW + "\n" + "="*60 + Style.RESET_ALL)
-            print(Fore.YELLOW + "              🗂️  目录管理              " + Style.RESET_ALL)
-            print(Fore.YELLOW + "="*60 + Style.RESET_ALL)
+        self.ui.mode_panel("🗂️  目录管理", [
+            "在此模式下，您可以管理输入/输出目录，查看文件列表，",
+            "清理旧文件，以及检查目录结构。"
+        ])
         
-        # 目录管理选项
-        options = [
-            ("查看输入目录", self._view_input_directory),
-            ("查看输出目录", self._view_output_directory),
-            ("查看失败目录", self._view_failed_directory),
-            ("清理旧文件", self._cleanup_old_files),
-            ("检查目录结构", self._check_directory_structure),
-            ("创建示例文件", self._create_example_files),
-            ("返回主菜单", None)
-        ]
-        
-        while True:
-            choice = self._ask_choice(
-                "请选择目录管理操作",
-                [opt[0] for opt in options],
-                allow_cancel=True
-            )
-            
-            if choice == len(options) - 1:  # 返回主菜单
-                break
-            
-            # 执行选中的操作
-            if options[choice][1]:
-                options[choice][1]()
+        self._show_unavailable("目录管理")
     
     def _handle_config_management(self):
         """处理配置管理"""
         self._clear_screen()
         
-        if HAS_RICH and self.console:
-            self.console.print(Panel(
-                "[bold yellow]⚙️  配置管理[/bold yellow]\n\n"
-                "在此模式下，您可以查看和修改解析配置，\n"
-                "调整输出格式，以及管理全局设置。",
-                title="模式说明",
-                border_style="yellow"
-            ))
-        
-        else:
-            print(Fore.YELLOW + "\n" + "="*60 + Style.RESET_ALL)
-            print(Fore.YELLOW + "              ⚙️  配置管理              " + Style.RESET_ALL)
-            print(Fore.YELLOW + "="*60 + Style.RESET_ALL)
-        
-        # 配置管理选项
-        options = [
-            ("查看当前配置", self._view_current_config),
-            ("修改路径配置", self._modify_path_config),
-            ("修改解析配置", self._modify_parsing_config),
-            ("修改输出配置", self._modify_output_config),
-            ("修改批量处理配置", self._modify_batch_config),
-            ("重置为默认配置", self._reset_to_default_config),
-            ("保存配置到文件", self._save_config_to_file),
-            ("加载配置文件", self._load_config_from_file),
-            ("返回主菜单", None)
-        ]
+        self.ui.mode_panel("⚙️  配置管理", [
+            "在此模式下，您可以查看和修改解析配置，",
+            "调整输出格式，以及管理全局设置。"
+        ])
         
-        while True:
-            choice = self._ask_choice(
-                "请选择配置管理操作",
-                [opt[0] for opt in options],
-                allow_cancel=True
-            )
-            
-            if choice == len(options) - 1:  # 返回主菜单
-                break
-            
-            # 执行选中的操作
-            if options[choice][1]:
-                options[choice][1]()
+        self._show_unavailable("配置管理")
     
     def _show_statistics(self):
         """显示统计信息"""
@@ -947,6 +934,225 @@ DeepSeek HTML解析器是一个专门用于将DeepSeek对话HTML文件转换为
 ### 脚本集成
 可以通过Python API集成到其他工作流程中:
 ```python
-from deepseek_parser import DeepSeekParser
+from core.deepseek_parser import DeepSeekParser
+from utils.file_ops import FileOperations
+
 parser = DeepSeekParser()
-result = parser.parse_file("conversation.html")
\ No newline at end of file
+result = parser.parse_html(FileOperations.read_file("conversation.html"))
+```
+"""
+        
+        if HAS_RICH and self.console:
+            self.console.print(Markdown(tutorial_content))
+        else:
+            print(tutorial_content)
+        
+        self._wait_for_keypress()
+    
+    # ==================== 批量处理结果 ====================
+    
+    def _show_batch_results(self, results: Dict[str, Any], test_mode: bool = False):
+        """显示批量处理结果"""
+        summary = {
+            '文件总数': results['total_files'],
+            '已检查' if test_mode else '成功': results['success'],
+            '失败': results['failed'],
+            '跳过未变化文件': results.get('skipped', 0),
+            '处理时间': f"{results.get('processing_time', 0):.2f} 秒"
+        }
+        if results.get('details_file'):
+            summary['处理明细'] = results['details_file']
+        
+        self._show_key_values("📊 批量处理结果", summary, "green" if not results['failed'] else "yellow")
+        
+        failed_files = results['failed_files']
+        if failed_files:
+            self._show_message(f"以下 {len(failed_files)} 个文件处理失败:", "warning")
+            for file_path in failed_files[:10]:
+                self._show_message(f"  {file_path}", "error")
+            if len(failed_files) > 10:
+                self._show_message(f"  ... 等共 {len(failed_files)} 个文件", "error")
+    
+    def _generate_batch_report(self, results: Dict[str, Any], output_dir: str, batch_id: str) -> str:
+        """将批量处理结果保存为JSON报告（与明细文件共用批次ID，不覆盖之前的报告），返回报告路径"""
+        total = results['total_files']
+        processing_time = results.get('processing_time', 0)
+        report = {
+            'report_id': f"report_{batch_id}",
+            'generated_at': datetime.now().isoformat(),
+            'summary': {
+                'total_files': total,
+                'success': results['success'],
+                'failed': results['failed'],
+                'skipped': results.get('skipped', 0),
+                'success_rate': results['success'] / total * 100 if total > 0 else 0,
+                'processing_time_seconds': processing_time,
+                'files_per_second': total / processing_time if processing_time > 0 else 0
+            },
+            'failed_files': results['failed_files'],
+            # 有明细文件时这里只有最近的明细，完整明细见 details_file
+            'details_file': results.get('details_file'),
+            'details': results['details']
+        }
+        
+        report_file = os.path.join(output_dir, f"batch_report_{batch_id}.json")
+        FileOperations.save_json(report, report_file)
+        self.logger.info(f"处理报告已保存: {report_file}")
+        return report_file
+    
+    # ==================== 输入与显示辅助方法 ====================
+    
+    def _clear_screen(self):
+        """清屏"""
+        if HAS_RICH and self.console:
+            self.console.clear()
+        else:
+            print("\033[2J\033[H", end="")
+    
+    def _show_message(self, message: str, level: str = "info"):
+        """按级别（success/error/warning/info）显示一行消息"""
+        color, icon = MESSAGE_STYLES.get(level, MESSAGE_STYLES['info'])
+        if HAS_RICH and self.console:
+            self.console.print(f"{icon} {message}", style=color, markup=False)
+        else:
+            print(getattr(Fore, color.upper()) + f"{icon} {message}" + Style.RESET_ALL)
+    
+    def _show_progress(self, message: str, percent: int):
+        """显示处理步骤及进度百分比"""
+        if HAS_RICH and self.console:
+            self.console.print(f"[{percent:>3}%] {message}", style="cyan", markup=False)
+        else:
+            print(Fore.CYAN + f"[{percent:>3}%] {message}" + Style.RESET_ALL)
+    
+    def _show_key_values(self, title: str, data: Dict[str, Any], border_style: str = "cyan"):
+        """以两列表格显示键值信息"""
+        if HAS_RICH and self.console:
+            table = Table(show_header=False, box=None)
+            table.add_column("项目", style="cyan")
+            table.add_column("值", style="white")
+            for key, value in data.items():
+                table.add_row(str(key), str(value))
+            self.console.print(Panel(table, title=title, border_style=border_style))
+        else:
+            print(Fore.YELLOW + "\n" + "="*60 + Style.RESET_ALL)
+            print(Fore.YELLOW + f"  {title}" + Style.RESET_ALL)
+            print(Fore.YELLOW + "="*60 + Style.RESET_ALL)
+            for key, value in data.items():
+                print(Fore.CYAN + f"  {key}: " + Fore.WHITE + f"{value}" + Style.RESET_ALL)
+    
+    def _show_processing_summary(self, summary: Dict[str, Any]):
+        """显示处理配置摘要"""
+        self._show_key_values("处理配置", summary, "cyan")
+    
+    def _show_processing_result(self, result: Dict[str, Any]):
+        """显示单文件处理结果"""
+        self._show_key_values("处理结果", result, "green")
+    
+    def _ask_text(self, prompt: str, default: Optional[str] = None) -> str:
+        """询问一行文本，直接回车时返回默认值（无默认值时为空字符串）"""
+        if HAS_RICH and self.console:
+            if default is None:
+                return Prompt.ask(f"[bold yellow]{prompt}[/bold yellow]", default="", show_default=False).strip()
+            return Prompt.ask(f"[bold yellow]{prompt}[/bold yellow]", default=default).strip()
+        
+        suffix = f" [{default}]" if default is not None else ""
+        answer = input(Fore.YELLOW + f"{prompt}{suffix}: " + Style.RESET_ALL).strip()
+        return answer or (default or "")
+    
+    def _ask_for_path(self, prompt: str, default: Optional[str] = None, is_file: bool = False) -> Optional[str]:
+        """询问路径（去除两端引号），直接回车且无默认值时返回None"""
+        path = self._ask_text(prompt, default).strip('"\'')
+        if not path:
+            return None
+        
+        path = os.path.expanduser(path)
+        if is_file and os.path.isdir(path):
+            self._show_message(f"需要文件路径，而不是目录: {path}", "error")
+            return None
+        return path
+    
+    def _ask_for_file(self, prompt: str) -> Optional[str]:
+        """询问文件路径"""
+        return self._ask_for_path(prompt, is_file=True)
+    
+    def _ask_for_directory(self, prompt: str, default: Optional[str] = None) -> Optional[str]:
+        """询问目录路径"""
+        return self._ask_for_path(prompt, default)
+    
+    def _ask_confirmation(self, prompt: str, default: bool = False) -> bool:
+        """询问是/否"""
+        if HAS_RICH and self.console:
+            return Confirm.ask(f"[bold yellow]{prompt}[/bold yellow]", default=default)
+        
+        hint = "Y/n" if default else "y/N"
+        answer = input(Fore.YELLOW + f"{prompt} ({hint}): " + Style.RESET_ALL).strip().lower()
+        if not answer:
+            return default
+        return answer in ('y', 'yes', '是')
+    
+    def _ask_choice(self, prompt: str, options: List[str], default: int = 0,
+                    allow_cancel: bool = False) -> int:
+        """
+        从编号列表中选择一项，返回其下标
+        
+        allow_cancel为True时直接回车选择最后一项（如"返回主菜单"）。
+        """
+        if allow_cancel:
+            default = len(options) - 1
+        
+        if HAS_RICH and self.console:
+            for i, option in enumerate(options, 1):
+                self.console.print(f"  [cyan]{i}.[/cyan] {option}")
+            choice = IntPrompt.ask(
+                f"[bold yellow]{prompt}[/bold yellow]",
+                choices=[str(i) for i in range(1, len(options) + 1)],
+                default=default + 1,
+                show_choices=False
+            )
+            return choice - 1
+        
+        print(Fore.CYAN + f"\n{prompt}:" + Style.RESET_ALL)
+        for i, option in enumerate(options, 1):
+            print(Fore.GREEN + f"  {i}. {option}" + Style.RESET_ALL)
+        while True:
+            answer = input(Fore.YELLOW + f"请输入编号 [{default + 1}]: " + Style.RESET_ALL).strip()
+            if not answer:
+                return default
+            if answer.isdigit() and 1 <= int(answer) <= len(options):
+                return int(answer) - 1
+            print(Fore.RED + f"无效选项，请输入 1-{len(options)} 之间的数字" + Style.RESET_ALL)
+    
+    def _show_unavailable(self, feature: str):
+        """提示功能尚未实现"""
+        self._show_message(f"{feature}功能尚未实现", "warning")
+        self._wait_for_keypress()
+    
+    def _wait_for_keypress(self):
+        """等待用户按回车继续"""
+        input("\n按回车键继续...")
+    
+    def _confirm_exit(self) -> bool:
+        """确认退出"""
+        return self._ask_confirmation("确定要退出程序吗？", default=True)
+    
+    def _show_goodbye(self):
+        """显示退出信息"""
+        message = f"感谢使用 DeepSeek HTML 解析器！本次会话共处理 {self.stats['files_processed']} 个文件。"
+        if HAS_RICH and self.console:
+            self.console.print(Panel(message, border_style="cyan"))
+        else:
+            print(Fore.CYAN + "\n" + message + Style.RESET_ALL)
+
+
+def main():
+    """交互式命令行入口：python interactive_cli.py [配置文件]"""
+    config_path = sys.argv[1] if len(sys.argv) > 1 else 'config.yaml'
+    try:
+        EnhancedInteractiveCLI(config_path).run()
+    except KeyboardInterrupt:
+        print("\n\n程序被用户中断")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -58,23 +58,13 @@ class DeepSeekParserCLI:
                 self.logger.warning("未解析到对话轮次")
                 return False
             
-            # 构建对话
-            conversation = self.builder.build(parsed_data)
+            # 构建对话（同时格式化内容）
+            conversation = self.builder.build(parsed_data, formatter=self.formatter)
             
             if not conversation.get('rounds'):
                 self.logger.warning("未构建出有效对话")
                 return False
             
-            # 格式化内容
-            for round_data in conversation['rounds']:
-                # 格式化用户内容
-                user_content = round_data['user']['content']
-                round_data['user']['content'] = self.formatter.format_content(user_content, 'user')
-                
-                # 格式化AI内容
-                ai_content = round_data['ai']['content']
-                round_data['ai']['content'] = self.formatter.format_content(ai_content, 'ai')
-            
             # 选择输出格式
             if format_type == 'simple':
                 writer = SimpleMarkdownWriter(self.config)
@@ -89,7 +79,7 @@ class DeepSeekParserCLI:
                 output_file = os.path.join(output_dir, f"{base_name}.md")
             
             # 写入Markdown
-            markdown_content = writer.write(conversation, output_file)
+            writer.write_to_file(conversation, output_file)
             
             self.logger.info(f"解析完成，输出文件: {output_file}")
             self.logger.info(f"对话ID: {conversation.get('dialog_id')}")
@@ -3,6 +3,7 @@ outputs/optimized_markdown.py
 按照第二份文档格式输出优化Markdown
 """
 import re
+from calendar import monthrange
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import logging
@@ -10,6 +11,42 @@ import logging
 from utils.logger import logger
 
 
+# 默认的轮次标题格式
+DEFAULT_TITLE_FORMAT = '[{dialog_id}-{round_id}] {keywords}'
+
+# 代码块：以 ``` 开头的行（允许缩进）开始，到下一个以 ``` 开头的行结束
+# 分组：1=开始标记行，2=代码行（每行含换行符），3=结束标记行
+_CODE_BLOCK_RE = re.compile(r'^([^\S\n]*```[^\n]*)\n((?:[^\n]*\n)*?)([^\S\n]*```[^\n]*)$', re.MULTILINE)
+
+# 代码块标记行（用于找出未闭合的代码块）
+_FENCE_LINE_RE = re.compile(r'^[^\S\n]*```', re.MULTILINE)
+
+# Markdown标题行
+_HEADING_RE = re.compile(r'^(#{1,6})\s+(.+)$')
+# 各级标题前缀，按级别索引（0级不使用）
+_HEADING_PREFIXES = tuple('#' * level + ' ' for level in range(7))
+
+# 锚点生成：需移除的特殊字符、需替换为横线的空白
+_ANCHOR_STRIP_RE = re.compile(r'[^\w\s-]')
+_ANCHOR_SPACE_RE = re.compile(r'\s+')
+# 只含ASCII字母、数字、下划线和横线的文本（如轮次ID V001-3），锚点只需转小写
+_ANCHOR_PLAIN_RE = re.compile(r'[A-Za-z0-9_-]+')
+
+# 常见ISO时间戳（YYYY-MM-DDTHH:MM[:SS[.fff|.ffffff]][Z|±HH:MM]），匹配时直接截取日期和时分；
+# 29~31日还需确认当月有这一天（见_format_timestamp），其余形式仍交给fromisoformat解析
+_ISO_TIMESTAMP_RE = re.compile(
+    r'(?!0000)\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])T(?:[01]\d|2[0-3]):[0-5]\d'
+    r'(?::[0-5]\d(?:\.\d{3}|\.\d{6})?)?(?:Z|[+-](?:[01]\d|2[0-3]):[0-5]\d)?'
+)
+
+
+def _format_datetime(dt: datetime, with_seconds: bool = True) -> str:
+    """格式化为 YYYY-MM-DD HH:MM[:SS]（直接拼接各字段，比strftime快）"""
+    if with_seconds:
+        return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}"
+
+
 class OptimizedMarkdownWriter:
     """按照第二份文档格式输出优化Markdown"""
     
@@ -19,7 +56,9 @@ class OptimizedMarkdownWriter:
         
         # 输出配置
         output_config = self.config.get('output', {})
-        self.title_format = output_config.get('title_format', '[{dialog_id}-{round_id}] {keywords}')
+        self.title_format = output_config.get('title_format', DEFAULT_TITLE_FORMAT)
+        # 默认标题格式直接拼接，无需每轮解析格式字符串
+        self._is_default_title_format = (self.title_format == DEFAULT_TITLE_FORMAT)
         self.max_title_length = output_config.get('max_title_length', 80)
         
         # 折叠设置
@@ -37,11 +76,20 @@ class OptimizedMarkdownWriter:
         self.blank_after_user_query = blank_lines_config.get('after_user_query', 1)
         self.blank_before_ai_response = blank_lines_config.get('before_ai_response', 0)
         
+        # 空行字符串在初始化时生成一次，每轮直接复用
+        self._between_rounds_blanks = self._add_blank_lines(self.blank_between_rounds)
+        self._before_user_query_blanks = self._add_blank_lines(self.blank_before_user_query)
+        self._after_user_query_blanks = self._add_blank_lines(self.blank_after_user_query)
+        self._before_ai_response_blanks = self._add_blank_lines(self.blank_before_ai_response)
+        
         # 导航设置
         self.generate_navigation = output_config.get('generate_navigation', False)
         
         # 初始化计数器
         self.code_block_counter = 0
+        
+        # 当前文档的生成时间（头部和脚注共用）
+        self._created_at = ''
     
     def write(self, conversation: Dict[str, Any], output_path: Optional[str] = None) -> str:
         """
@@ -55,39 +103,15 @@ class OptimizedMarkdownWriter:
             Markdown文档内容
         """
         try:
-            self.logger.info(f"开始生成优化Markdown，对话ID: {conversation.get('dialog_id')}")
+            self.logger.info("开始生成优化Markdown，对话ID: %s", conversation.get('dialog_id'))
             
-            # 1. 生成文档标题
-            content = self._generate_document_header(conversation)
+            content = ''.join(self._iter_document_parts(conversation))
             
-            # 2. 如果需要，生成导航
-            if self.generate_navigation:
-                content += self._generate_navigation(conversation)
-                content += self._add_blank_lines(2)
-            
-            # 3. 按轮次生成内容
-            rounds = conversation.get('rounds', [])
-            total_rounds = len(rounds)
-            
-            for i, round_data in enumerate(rounds):
-                round_num = i + 1
-                
-                # 生成轮次内容
-                round_content = self._generate_round_content(round_data, round_num, total_rounds)
-                content += round_content
-                
-                # 添加轮次之间的空行（最后一个轮次后不加）
-                if i < total_rounds - 1:
-                    content += self._add_blank_lines(self.blank_between_rounds)
-            
-            # 4. 添加文档脚注
-            content += self._generate_document_footer(conversation)
-            
-            # 5. 保存到文件（如果提供了路径）
+            # 保存到文件（如果提供了路径）
             if output_path:
                 from utils.file_ops import FileOperations
                 FileOperations.write_file(output_path, content)
-                self.logger.info(f"Markdown文档已保存到: {output_path}")
+                self.logger.info("Markdown文档已保存到: %s", output_path)
             
             return content
             
@@ -95,6 +119,59 @@ class OptimizedMarkdownWriter:
             self.logger.error(f"生成优化Markdown失败: {e}")
             raise
     
+    def write_to_file(self, conversation: Dict[str, Any], output_path: str) -> int:
+        """
+        生成优化格式的Markdown文档并逐段写入文件
+        
+        不在内存中拼接完整文档，适合只需要落盘的场景。
+        
+        Returns:
+            写入的字节数
+        """
+        try:
+            self.logger.info("开始生成优化Markdown，对话ID: %s", conversation.get('dialog_id'))
+            
+            from utils.file_ops import FileOperations
+            written_bytes = FileOperations.write_chunks(output_path, self._iter_document_parts(conversation))
+            self.logger.info("Markdown文档已保存到: %s", output_path)
+            
+            return written_bytes
+            
+        except Exception as e:
+            self.logger.error(f"生成优化Markdown失败: {e}")
+            raise
+    
+    def _iter_document_parts(self, conversation: Dict[str, Any]):
+        """按文档顺序逐段生成Markdown内容"""
+        # 代码块编号按文档计数（同一写入器会被用于批量中的多个文档）
+        self.code_block_counter = 0
+        self._created_at = _format_datetime(datetime.now())
+        
+        # 1. 生成文档标题
+        yield self._generate_document_header(conversation)
+        
+        # 2. 如果需要，生成导航
+        if self.generate_navigation:
+            yield self._generate_navigation(conversation)
+            yield self._add_blank_lines(2)
+        
+        # 3. 按轮次生成内容
+        rounds = conversation.get('rounds', [])
+        total_rounds = len(rounds)
+        
+        for i, round_data in enumerate(rounds):
+            round_num = i + 1
+            
+            # 生成轮次内容
+            yield self._generate_round_content(round_data, round_num, total_rounds)
+            
+            # 添加轮次之间的空行（最后一个轮次后不加）
+            if i < total_rounds - 1:
+                yield self._between_rounds_blanks
+        
+        # 4. 添加文档脚注
+        yield self._generate_document_footer(conversation)
+    
     def _generate_document_header(self, conversation: Dict[str, Any]) -> str:
         """生成文档标题和头部信息"""
         dialog_id = conversation.get('dialog_id', '未知')
@@ -104,21 +181,27 @@ class OptimizedMarkdownWriter:
         title_keywords = metadata.get('title_keywords', '技术对话')
         main_title = f"# {title_keywords}\n\n"
         
-        # 添加元数据信息
-        header_comment = f"<!--\n"
-        header_comment += f"对话ID: {dialog_id}\n"
-        header_comment += f"创建时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        header_comment += f"总轮次: {metadata.get('total_rounds', 0)}\n"
-        header_comment += f"技术轮次: {metadata.get('technical_rounds', 0)}\n"
-        header_comment += f"估计字数: {metadata.get('estimated_total_words', 0)}\n"
+        if not self.add_metadata_comments:
+            return main_title
+        
+        # 添加元数据注释
+        parts = [
+            main_title,
+            "<!--\n",
+            f"对话ID: {dialog_id}\n",
+            f"创建时间: {self._created_at}\n",
+            f"总轮次: {metadata.get('total_rounds', 0)}\n",
+            f"技术轮次: {metadata.get('technical_rounds', 0)}\n",
+            f"估计字数: {metadata.get('estimated_total_words', 0)}\n",
+        ]
         
         source_file = metadata.get('source_file')
         if source_file:
-            header_comment += f"来源文件: {source_file}\n"
+            parts.append(f"来源文件: {source_file}\n")
         
-        header_comment += f"-->\n\n"
+        parts.append("-->\n\n")
         
-        return main_title + header_comment
+        return ''.join(parts)
     
     def _generate_navigation(self, conversation: Dict[str, Any]) -> str:
         """生成目录导航"""
@@ -127,7 +210,7 @@ class OptimizedMarkdownWriter:
         if not rounds:
             return ""
         
-        navigation = "## 目录\n\n"
+        parts = ["## 目录\n\n"]
         
         for i, round_data in enumerate(rounds):
             round_id = round_data.get('round_id', f"轮次{i+1}")
@@ -137,58 +220,66 @@ class OptimizedMarkdownWriter:
                 user_keywords = round_data['metadata'].get('main_topic', '未命名主题')
             
             # 生成导航项
-            navigation += f"{i+1}. [{round_id} {user_keywords}](#{self._generate_anchor(round_id, user_keywords)})\n"
+            parts.append(f"{i+1}. [{round_id} {user_keywords}](#{self._generate_anchor(round_id, user_keywords)})\n")
         
-        return navigation + "\n"
+        parts.append("\n")
+        return ''.join(parts)
     
     def _generate_round_content(self, round_data: Dict[str, Any], round_num: int, total_rounds: int) -> str:
         """生成单个轮次的内容"""
-        content = ""
+        round_id = round_data.get('round_id', '未知轮次')
+        user_data = round_data['user']
+        ai_data = round_data['ai']
         
         # 1. 轮次标题
-        content += self._generate_round_title(round_data)
+        parts = [self._generate_round_title(round_id, user_data, ai_data)]
         
-        # 2. 轮次开始标记点
+        # 2. 轮次开始标记点（开始和结束标记共用时间、主题信息）
         if self.add_round_markers:
-            content += self._generate_round_marker(round_data, 'start')
+            marker_details = self._generate_marker_details(round_data.get('metadata', {}))
+            parts.append(self._generate_round_marker(round_id, marker_details, 'start'))
         
         # 3. 用户问题（可能折叠）
-        content += self._wrap_user_query(round_data['user'])
+        parts.append(self._wrap_user_query(user_data))
         
         # 4. AI回答
-        content += self._format_ai_response(round_data['ai'])
+        parts.append(self._format_ai_response(ai_data))
         
         # 5. 轮次结束标记点
         if self.add_round_markers:
-            content += self._generate_round_marker(round_data, 'end')
+            parts.append(self._generate_round_marker(round_id, marker_details, 'end'))
         
         # 6. 添加进度信息（可选）
         if self.add_metadata_comments:
-            content += self._generate_round_progress(round_num, total_rounds)
+            parts.append(self._generate_round_progress(round_num, total_rounds))
         
-        return content
+        return ''.join(parts)
     
-    def _generate_round_title(self, round_data: Dict[str, Any]) -> str:
+    def _generate_round_title(self, round_id: str, user_data: Dict[str, Any], ai_data: Dict[str, Any]) -> str:
         """生成轮次标题"""
-        round_id = round_data.get('round_id', '未知轮次')
-        user_data = round_data.get('user', {})
-        
         # 提取关键词
         keywords = user_data.get('keywords', [])
         if not keywords:
             # 从AI回答中提取关键词
-            ai_keywords = round_data.get('ai', {}).get('keywords', [])
+            ai_keywords = ai_data.get('keywords', [])
             keywords = ai_keywords[:3]
         
         # 生成标题文本
         keywords_text = ' '.join(keywords[:3])  # 最多3个关键词
         
-        # 应用标题格式
-        title = self.title_format.format(
-            dialog_id=round_id.split('-')[0] if '-' in round_id else round_id,
-            round_id=round_id.split('-')[1] if '-' in round_id else '1',
-            keywords=keywords_text
-        )
+        # 应用标题格式（轮次ID形如 对话ID-轮次号）
+        id_parts = round_id.split('-')
+        dialog_part = id_parts[0]
+        round_part = id_parts[1] if len(id_parts) > 1 else '1'
+        
+        if self._is_default_title_format:
+            title = f"[{dialog_part}-{round_part}] {keywords_text}"
+        else:
+            title = self.title_format.format(
+                dialog_id=dialog_part,
+                round_id=round_part,
+                keywords=keywords_text
+            )
         
         # 限制标题长度
         if len(title) > self.max_title_length:
@@ -197,12 +288,23 @@ class OptimizedMarkdownWriter:
         # 添加Markdown标题标记
         return f"# {title}\n\n"
     
-    def _generate_round_marker(self, round_data: Dict[str, Any], marker_type: str) -> str:
-        """生成轮次标记点"""
-        round_id = round_data.get('round_id', '未知轮次')
-        timestamp = round_data.get('metadata', {}).get('created_at', '')
-        topic = round_data.get('metadata', {}).get('main_topic', '未分类')
+    def _generate_marker_details(self, round_metadata: Dict[str, Any]) -> str:
+        """生成标记点中的时间、主题信息"""
+        timestamp = round_metadata.get('created_at', '')
+        topic = round_metadata.get('main_topic', '未分类')
+        
+        parts = []
         
+        if timestamp:
+            parts.append(f" | 时间: {timestamp}")
+        
+        if topic:
+            parts.append(f" | 主题: {topic}")
+        
+        return ''.join(parts)
+    
+    def _generate_round_marker(self, round_id: str, marker_details: str, marker_type: str) -> str:
+        """生成轮次标记点"""
         if marker_type == 'start':
             marker_text = f"轮次开始 {round_id}"
         elif marker_type == 'end':
@@ -210,31 +312,15 @@ class OptimizedMarkdownWriter:
         else:
             marker_text = f"轮次标记 {round_id}"
         
-        comment = f"<!-- {marker_text}"
-        
-        if timestamp:
-            comment += f" | 时间: {timestamp}"
-        
-        if topic:
-            comment += f" | 主题: {topic}"
-        
-        comment += " -->\n\n"
-        
-        return comment
+        return f"<!-- {marker_text}{marker_details} -->\n\n"
     
     def _wrap_user_query(self, user_data: Dict[str, Any]) -> str:
-        """包装用户问题（可能折叠）"""
-        content = ""
-        
-        # 添加用户问题前的空行
-        if self.blank_before_user_query > 0:
-            content += self._add_blank_lines(self.blank_before_user_query)
-        
+        """包装用户问题（可能折叠）；用户问题为空时不输出任何内容（包括前后空行）"""
         # 用户问题内容
         user_content = user_data.get('content', '').strip()
         
         if not user_content:
-            return content
+            return ""
         
         if self.fold_user_queries:
             # 生成折叠的用户问题
@@ -245,7 +331,7 @@ class OptimizedMarkdownWriter:
             if timestamp:
                 summary_text += f" - {self._format_timestamp(timestamp)}"
             
-            folded_content = f"""<details class="user-query" data-collapsed="true">
+            query_content = f"""<details class="user-query" data-collapsed="true">
 <summary>{summary_text}</summary>
 
 {user_content}
@@ -253,106 +339,95 @@ class OptimizedMarkdownWriter:
 </details>
 
 """
-            content += folded_content
         else:
             # 直接显示用户问题
-            content += f"**用户提问:**\n\n{user_content}\n\n"
+            query_content = f"**用户提问:**\n\n{user_content}\n\n"
         
-        # 添加用户问题后的空行
-        if self.blank_after_user_query > 0:
-            content += self._add_blank_lines(self.blank_after_user_query)
-        
-        return content
+        # 前后空行
+        return f"{self._before_user_query_blanks}{query_content}{self._after_user_query_blanks}"
     
     def _format_ai_response(self, ai_data: Dict[str, Any]) -> str:
         """格式化AI回答"""
-        content = ""
+        parts = []
         
         # 添加AI回答前的空行
-        if self.blank_before_ai_response > 0:
-            content += self._add_blank_lines(self.blank_before_ai_response)
+        if self._before_ai_response_blanks:
+            parts.append(self._before_ai_response_blanks)
         
         # AI回答内容
         ai_content = ai_data.get('content', '').strip()
         
         if not ai_content:
-            return content
+            return ''.join(parts)
         
-        # 处理代码块（如果需要折叠长代码块）
-        if self.fold_long_code_blocks > 0:
-            ai_content = self._process_code_blocks_for_folding(ai_content)
+        # 折叠长代码块，并确保代码块之外的标题层级从##开始
+        parts.append(self._postprocess_ai(ai_content))
+        parts.append("\n")
         
-        # 确保AI回答中的标题层级从##开始
-        ai_content = self._ensure_heading_levels(ai_content)
+        return ''.join(parts)
+    
+    def _postprocess_ai(self, content: str) -> str:
+        """
+        一次遍历处理AI回答：代码块按需折叠，代码块之外的内容调整标题层级
         
-        content += ai_content + "\n"
+        代码块内以#开头的行（如注释）保持原样；未闭合的代码块从开始标记起原样保留。
+        """
+        if '```' not in content:
+            return self._ensure_heading_levels(content)
+        
+        parts = []
+        pos = 0
+        for match in _CODE_BLOCK_RE.finditer(content):
+            parts.append(self._ensure_heading_levels(content[pos:match.start()]))
+            if self.fold_long_code_blocks > 0:
+                parts.append(self._fold_code_block(match))
+            else:
+                parts.append(match.group(0))
+            pos = match.end()
+        
+        tail = content[pos:]
+        unclosed = _FENCE_LINE_RE.search(tail)
+        if unclosed:
+            parts.append(self._ensure_heading_levels(tail[:unclosed.start()]))
+            parts.append(tail[unclosed.start():])
+        else:
+            parts.append(self._ensure_heading_levels(tail))
         
-        return content
+        return ''.join(parts)
     
-    def _process_code_blocks_for_folding(self, content: str) -> str:
-        """处理代码块，对长代码块进行折叠"""
-        lines = content.split('\n')
-        processed_lines = []
-        in_code_block = False
-        code_block_lines = []
-        code_block_start = 0
-        current_language = ''
-        
-        for i, line in enumerate(lines):
-            # 检测代码块开始
-            if line.strip().startswith('```'):
-                if not in_code_block:
-                    # 代码块开始
-                    in_code_block = True
-                    code_block_start = i
-                    current_language = line.strip()[3:].strip()
-                    code_block_lines = [line]
-                else:
-                    # 代码块结束
-                    code_block_lines.append(line)
-                    in_code_block = False
-                    
-                    # 检查代码块长度
-                    code_block_content = '\n'.join(code_block_lines)
-                    
-                    if len(code_block_lines) - 2 > self.fold_long_code_blocks:  # 减去开始和结束标记
-                        # 需要折叠
-                        self.code_block_counter += 1
-                        code_id = f"code-block-{self.code_block_counter}"
-                        
-                        folded_code = f"""<details class="long-code-block" id="{code_id}" data-collapsed="true">
-<summary>{current_language or '代码'} ({len(code_block_lines)-2} 行)</summary>
+    def _fold_code_block(self, match: re.Match) -> str:
+        """折叠单个代码块（超过设定行数时）"""
+        code_lines = match.group(2).count('\n')  # 不含开始和结束标记
+        if code_lines <= self.fold_long_code_blocks:
+            return match.group(0)
+        
+        self.code_block_counter += 1
+        code_id = f"code-block-{self.code_block_counter}"
+        current_language = match.group(1).strip()[3:].strip()
+        
+        return f"""<details class="long-code-block" id="{code_id}" data-collapsed="true">
+<summary>{current_language or '代码'} ({code_lines} 行)</summary>
 
-{code_block_content}
+{match.group(0)}
 
 </details>"""
-                        
-                        processed_lines.append(folded_code)
-                    else:
-                        # 不需要折叠，直接添加
-                        processed_lines.extend(code_block_lines)
-                    
-                    code_block_lines = []
-            elif in_code_block:
-                # 在代码块内
-                code_block_lines.append(line)
-            else:
-                # 不在代码块内
-                processed_lines.append(line)
-        
-        # 如果仍在代码块内（异常情况），直接添加剩余内容
-        if code_block_lines:
-            processed_lines.extend(code_block_lines)
-        
-        return '\n'.join(processed_lines)
     
     def _ensure_heading_levels(self, content: str, base_level: int = 2) -> str:
         """确保标题层级从指定级别开始"""
+        # 没有以#开头的行时不存在标题，无需逐行处理
+        if not content.startswith('#') and '\n#' not in content:
+            return content
+        
         lines = content.split('\n')
         adjusted_lines = []
         
         for line in lines:
-            heading_match = re.match(r'^(#{1,6})\s+(.+)$', line)
+            # 非标题行无需正则匹配
+            if not line.startswith('#'):
+                adjusted_lines.append(line)
+                continue
+            
+            heading_match = _HEADING_RE.match(line)
             if heading_match:
                 current_level = len(heading_match.group(1))
                 heading_text = heading_match.group(2)
@@ -364,8 +439,10 @@ class OptimizedMarkdownWriter:
                 if new_level < base_level:
                     new_level = base_level
                 
-                new_heading = '#' * new_level + ' ' + heading_text
-                adjusted_lines.append(new_heading)
+                if new_level < len(_HEADING_PREFIXES):
+                    adjusted_lines.append(_HEADING_PREFIXES[new_level] + heading_text)
+                else:
+                    adjusted_lines.append('#' * new_level + ' ' + heading_text)
             else:
                 adjusted_lines.append(line)
         
@@ -382,28 +459,28 @@ class OptimizedMarkdownWriter:
         bar_length = 20
         filled_length = int(bar_length * current_round / total_rounds)
         bar = '█' * filled_length + '░' * (bar_length - filled_length)
-        progress += f"<!-- [{bar}] -->\n"
         
-        return progress + "\n"
+        return f"{progress}<!-- [{bar}] -->\n\n"
     
     def _generate_document_footer(self, conversation: Dict[str, Any]) -> str:
         """生成文档脚注"""
         metadata = conversation.get('metadata', {})
         dialog_id = conversation.get('dialog_id', '未知')
         
-        footer = "\n---\n\n"
-        footer += "## 文档信息\n\n"
-        footer += f"- **对话ID:** {dialog_id}\n"
-        footer += f"- **创建时间:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-        footer += f"- **总轮次:** {metadata.get('total_rounds', 0)}\n"
-        footer += f"- **技术轮次:** {metadata.get('technical_rounds', 0)}\n"
-        footer += f"- **估计阅读时间:** {metadata.get('estimated_total_words', 0) // 200 + 1} 分钟\n"
-        
-        # 添加生成器信息
-        footer += f"- **生成工具:** DeepSeek HTML解析器\n"
-        footer += f"- **生成格式:** 优化Markdown (v1.0)\n"
-        
-        return footer
+        parts = [
+            "\n---\n\n",
+            "## 文档信息\n\n",
+            f"- **对话ID:** {dialog_id}\n",
+            f"- **创建时间:** {self._created_at}\n",
+            f"- **总轮次:** {metadata.get('total_rounds', 0)}\n",
+            f"- **技术轮次:** {metadata.get('technical_rounds', 0)}\n",
+            f"- **估计阅读时间:** {metadata.get('estimated_total_words', 0) // 200 + 1} 分钟\n",
+            # 生成器信息
+            "- **生成工具:** DeepSeek HTML解析器\n",
+            "- **生成格式:** 优化Markdown (v1.0)\n",
+        ]
+        
+        return ''.join(parts)
     
     def _add_blank_lines(self, count: int) -> str:
         """添加指定数量的空行"""
@@ -414,10 +491,13 @@ class OptimizedMarkdownWriter:
         # 使用round_id或关键词生成锚点
         anchor_text = text if text else fallback
         
+        if _ANCHOR_PLAIN_RE.fullmatch(anchor_text):
+            return anchor_text.lower().strip('-')
+        
         # 转换为小写，移除特殊字符，用横线替换空格
         anchor = anchor_text.lower()
-        anchor = re.sub(r'[^\w\s-]', '', anchor)
-        anchor = re.sub(r'\s+', '-', anchor)
+        anchor = _ANCHOR_STRIP_RE.sub('', anchor)
+        anchor = _ANCHOR_SPACE_RE.sub('-', anchor)
         anchor = anchor.strip('-')
         
         return anchor
@@ -427,11 +507,17 @@ class OptimizedMarkdownWriter:
         if not timestamp:
             return ""
         
+        # 常见ISO格式：直接截取，无需解析
+        if _ISO_TIMESTAMP_RE.fullmatch(timestamp) and (
+                timestamp[8:10] <= '28'
+                or int(timestamp[8:10]) <= monthrange(int(timestamp[:4]), int(timestamp[5:7]))[1]):
+            return f"{timestamp[:10]} {timestamp[11:16]}"
+        
         try:
-            # 尝试解析ISO格式
+            # 尝试解析其他ISO格式
             if 'T' in timestamp:
                 dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                return dt.strftime('%Y-%m-%d %H:%M')
+                return _format_datetime(dt, with_seconds=False)
             else:
                 return timestamp
         except Exception:
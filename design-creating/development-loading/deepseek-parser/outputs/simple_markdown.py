@@ -20,57 +20,74 @@ class SimpleMarkdownWriter:
     def write(self, conversation: Dict[str, Any], output_path: Optional[str] = None) -> str:
         """生成简单格式的Markdown文档"""
         try:
-            self.logger.info(f"开始生成简单Markdown，对话ID: {conversation.get('dialog_id')}")
+            self.logger.info("开始生成简单Markdown，对话ID: %s", conversation.get('dialog_id'))
             
-            content = ""
+            content = ''.join(self._iter_document_parts(conversation))
             
-            # 1. 文档标题
-            dialog_id = conversation.get('dialog_id', '未知对话')
-            content += f"# 对话 {dialog_id}\n\n"
-            
-            # 2. 元数据
-            metadata = conversation.get('metadata', {})
-            content += "## 元数据\n\n"
-            content += f"- **总轮次:** {metadata.get('total_rounds', 0)}\n"
-            content += f"- **创建时间:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
-            
-            source_file = metadata.get('source_file')
-            if source_file:
-                content += f"- **来源文件:** {source_file}\n"
-            
-            content += "\n---\n\n"
-            
-            # 3. 对话内容
-            content += "## 对话内容\n\n"
-            
-            rounds = conversation.get('rounds', [])
-            for i, round_data in enumerate(rounds):
-                round_id = round_data.get('round_id', f"轮次{i+1}")
-                
-                content += f"### {round_id}\n\n"
-                
-                # 用户问题
-                user_content = round_data['user'].get('content', '').strip()
-                if user_content:
-                    content += f"**用户:**\n\n{user_content}\n\n"
-                
-                # AI回答
-                ai_content = round_data['ai'].get('content', '').strip()
-                if ai_content:
-                    content += f"**AI:**\n\n{ai_content}\n\n"
-                
-                # 分隔线
-                if i < len(rounds) - 1:
-                    content += "---\n\n"
-            
-            # 4. 保存到文件（如果提供了路径）
+            # 保存到文件（如果提供了路径）
             if output_path:
                 from utils.file_ops import FileOperations
                 FileOperations.write_file(output_path, content)
-                self.logger.info(f"简单Markdown文档已保存到: {output_path}")
+                self.logger.info("简单Markdown文档已保存到: %s", output_path)
             
             return content
             
         except Exception as e:
             self.logger.error(f"生成简单Markdown失败: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def write_to_file(self, conversation: Dict[str, Any], output_path: str) -> int:
+        """生成简单格式的Markdown文档并逐段写入文件，返回写入的字节数"""
+        try:
+            self.logger.info("开始生成简单Markdown，对话ID: %s", conversation.get('dialog_id'))
+            
+            from utils.file_ops import FileOperations
+            written_bytes = FileOperations.write_chunks(output_path, self._iter_document_parts(conversation))
+            self.logger.info("简单Markdown文档已保存到: %s", output_path)
+            
+            return written_bytes
+            
+        except Exception as e:
+            self.logger.error(f"生成简单Markdown失败: {e}")
+            raise
+    
+    def _iter_document_parts(self, conversation: Dict[str, Any]):
+        """按文档顺序逐段生成Markdown内容（文档头部一段，每个轮次一段）"""
+        dialog_id = conversation.get('dialog_id', '未知对话')
+        metadata = conversation.get('metadata', {})
+        source_file = metadata.get('source_file')
+        source_line = f"- **来源文件:** {source_file}\n" if source_file else ""
+        
+        # 1. 文档标题和元数据
+        yield (
+            f"# 对话 {dialog_id}\n\n"
+            "## 元数据\n\n"
+            f"- **总轮次:** {metadata.get('total_rounds', 0)}\n"
+            f"- **创建时间:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"{source_line}"
+            "\n---\n\n"
+            "## 对话内容\n\n"
+        )
+        
+        # 2. 对话内容
+        rounds = conversation.get('rounds', [])
+        last_index = len(rounds) - 1
+        for i, round_data in enumerate(rounds):
+            round_id = round_data.get('round_id', f"轮次{i+1}")
+            parts = [f"### {round_id}\n\n"]
+            
+            # 用户问题
+            user_content = round_data['user'].get('content', '').strip()
+            if user_content:
+                parts.append(f"**用户:**\n\n{user_content}\n\n")
+            
+            # AI回答
+            ai_content = round_data['ai'].get('content', '').strip()
+            if ai_content:
+                parts.append(f"**AI:**\n\n{ai_content}\n\n")
+            
+            # 分隔线
+            if i < last_index:
+                parts.append("---\n\n")
+            
+            yield ''.join(parts)
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+tests/test_batch_processor.py
+测试批量处理流程
+"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+from batch.processor import BATCH_MANIFEST_FILE, BatchProcessor
+
+
+# 可以解析出一轮技术对话的最小HTML
+CONVERSATION_HTML = (
+    '<html><body>'
+    '<div class="message-user"><p>如何配置 Docker 网络？</p></div>'
+    '<div class="message-assistant"><h2>方法</h2><p>配置步骤如下，使用 python 编写。</p>'
+    '<pre><code class="python">import os</code></pre></div>'
+    '</body></html>'
+)
+
+
+class TestBatchProcessor(unittest.TestCase):
+    """测试批量处理器的逐文件处理流程"""
+    
+    def setUp(self):
+        """测试前准备：在临时目录中创建输入文件"""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        root = Path(self._tmp_dir.name)
+        self.config = {
+            'paths': {
+                'input_dir': str(root / 'in'),
+                'output_dir': str(root / 'out'),
+                'failed_dir': str(root / 'failed')
+            }
+        }
+        self.input_dir = root / 'in'
+        self.input_dir.mkdir()
+        
+        self.html_files = []
+        for name in ('a', 'b', 'c'):
+            file_path = self.input_dir / f'{name}.html'
+            file_path.write_text(CONVERSATION_HTML, encoding='utf-8')
+            self.html_files.append(str(file_path))
+        
+        empty_file = self.input_dir / 'empty.html'
+        empty_file.write_text('', encoding='utf-8')
+        self.empty_file = str(empty_file)
+        self.missing_file = str(self.input_dir / 'missing.html')
+    
+    def _run(self, html_files, workers, overwrite=False):
+        """用新的批量处理器处理文件，返回 (输出目录, {文件路径: 处理结果})"""
+        output_dir = tempfile.mkdtemp(dir=self._tmp_dir.name)
+        processor = BatchProcessor(self.config)
+        results = dict(processor.iter_results(html_files, output_dir, overwrite, workers=workers))
+        return output_dir, results
+    
+    def test_serial_results_in_input_order(self):
+        """测试串行处理按输入顺序返回结果，并写出Markdown文件"""
+        html_files = self.html_files + [self.empty_file, self.missing_file]
+        output_dir = tempfile.mkdtemp(dir=self._tmp_dir.name)
+        processor = BatchProcessor(self.config)
+        
+        results = list(processor.iter_results(html_files, output_dir, False, workers=1))
+        
+        self.assertEqual([file_path for file_path, _ in results], html_files)
+        for _, file_result in results[:3]:
+            self.assertTrue(file_result['success'])
+            self.assertTrue(os.path.exists(file_result['output_file']))
+        self.assertEqual([r['dialog_id'] for _, r in results[:3]], ['V001', 'V002', 'V003'])
+    
+    def test_failures_are_reported_not_raised(self):
+        """测试空文件和不存在的文件作为失败结果返回"""
+        _, results = self._run([self.empty_file, self.missing_file], workers=1)
+        
+        self.assertFalse(results[self.empty_file]['success'])
+        self.assertEqual(results[self.empty_file]['error'], '文件内容为空')
+        self.assertFalse(results[self.missing_file]['success'])
+        self.assertIn('missing.html', results[self.missing_file]['error'])
+    
+    def test_parallel_matches_serial(self):
+        """测试多进程处理与串行处理的结果一致（对话ID按文件顺序分配）"""
+        html_files = self.html_files + [self.empty_file]
+        serial_dir, serial = self._run(html_files, workers=1)
+        parallel_dir, parallel = self._run(html_files, workers=2)
+        
+        self.assertEqual(set(parallel), set(html_files))
+        for file_path in html_files:
+            self.assertEqual(parallel[file_path]['success'], serial[file_path]['success'])
+            self.assertEqual(parallel[file_path].get('dialog_id'), serial[file_path].get('dialog_id'))
+        self.assertEqual(sorted(os.listdir(parallel_dir)), sorted(os.listdir(serial_dir)))
+    
+    def test_no_overwrite_keeps_existing_output(self):
+        """测试不覆盖时同名输出另存为新文件"""
+        output_dir = tempfile.mkdtemp(dir=self._tmp_dir.name)
+        
+        first = dict(BatchProcessor(self.config).iter_results(self.html_files[:1], output_dir, False, workers=1))
+        second = dict(BatchProcessor(self.config).iter_results(self.html_files[:1], output_dir, False, workers=1))
+        
+        first_output = first[self.html_files[0]]['output_file']
+        second_output = second[self.html_files[0]]['output_file']
+        self.assertNotEqual(first_output, second_output)
+        self.assertTrue(os.path.exists(first_output))
+        self.assertTrue(os.path.exists(second_output))
+    
+    def _process_and_record(self, output_dir):
+        """按交互式批量处理的方式处理输入文件，记入并保存清单，返回重新读取的清单"""
+        processor = BatchProcessor(self.config)
+        manifest = processor.load_manifest(output_dir)
+        for file_path, file_result in processor.iter_results(self.html_files, output_dir, False, workers=1):
+            if file_result['success']:
+                manifest[os.path.abspath(file_path)] = (processor.file_change_key(file_path)
+                                                        + [file_result['output_file']])
+        processor.save_manifest(output_dir, manifest)
+        return processor.load_manifest(output_dir)
+    
+    def test_manifest_skips_unchanged_file(self):
+        """测试处理后未修改的文件在清单中判定为未变化"""
+        output_dir = tempfile.mkdtemp(dir=self._tmp_dir.name)
+        manifest = self._process_and_record(output_dir)
+        
+        for file_path in self.html_files:
+            change_key = BatchProcessor.file_change_key(file_path)
+            self.assertTrue(BatchProcessor.is_unchanged(manifest, file_path, change_key))
+    
+    def test_manifest_reprocesses_touched_file(self):
+        """测试修改时间或大小变化的文件需要重新处理"""
+        output_dir = tempfile.mkdtemp(dir=self._tmp_dir.name)
+        manifest = self._process_and_record(output_dir)
+        
+        touched, grown = self.html_files[:2]
+        st = os.stat(touched)
+        os.utime(touched, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        with open(grown, 'a', encoding='utf-8') as f:
+            f.write('\n')
+        
+        for file_path in (touched, grown):
+            change_key = BatchProcessor.file_change_key(file_path)
+            self.assertFalse(BatchProcessor.is_unchanged(manifest, file_path, change_key))
+    
+    def test_manifest_reprocesses_file_with_missing_output(self):
+        """测试输出文件被删除后需要重新处理"""
+        output_dir = tempfile.mkdtemp(dir=self._tmp_dir.name)
+        manifest = self._process_and_record(output_dir)
+        
+        file_path = self.html_files[0]
+        os.remove(manifest[os.path.abspath(file_path)][2])
+        
+        change_key = BatchProcessor.file_change_key(file_path)
+        self.assertFalse(BatchProcessor.is_unchanged(manifest, file_path, change_key))
+    
+    def test_missing_or_corrupt_manifest(self):
+        """测试清单不存在、损坏或格式不对时按空清单处理"""
+        output_dir = tempfile.mkdtemp(dir=self._tmp_dir.name)
+        self.assertEqual(BatchProcessor.load_manifest(output_dir), {})
+        
+        manifest_file = os.path.join(output_dir, BATCH_MANIFEST_FILE)
+        for content in ('{"a.html": [1, 2', '[1, 2, 3]'):
+            with open(manifest_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+            self.assertEqual(BatchProcessor.load_manifest(output_dir), {})
+        
+        # 条目格式不对时视为未处理过
+        file_path = self.html_files[0]
+        manifest = {os.path.abspath(file_path): [1]}
+        change_key = BatchProcessor.file_change_key(file_path)
+        self.assertFalse(BatchProcessor.is_unchanged(manifest, file_path, change_key))
+    
+    def tearDown(self):
+        """测试后清理临时目录"""
+        self._tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
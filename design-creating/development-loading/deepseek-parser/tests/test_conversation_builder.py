@@ -0,0 +1,92 @@
+"""
+tests/test_conversation_builder.py
+测试对话构建器
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core import conversation_builder
+from core.conversation_builder import ConversationBuilder
+
+
+class TestConversationBuilder(unittest.TestCase):
+    """测试对话构建器的内容分析"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.builder = ConversationBuilder()
+    
+    def test_analyze_content_matches_previous_results(self):
+        """测试单次扫描的内容分析与逐项分析的结果一致"""
+        content = (
+            "## 方法\n\n配置 Docker 网络需要以下步骤：\n\n1. 创建网络\n- 使用 bridge 驱动\n\n"
+            "```bash\ndocker network create mynet\ndocker run --network mynet nginx\n```\n\n"
+            "参考 [文档](https://docs.docker.com) 和 [指南](https://example.com)。\n### 小结\n完成。"
+        )
+        
+        analysis = self.builder._analyze_content(content, 'ai')
+        
+        # 期望值来自改为单次扫描之前的实现
+        self.assertEqual(analysis['word_count'], 29)
+        self.assertEqual(analysis['char_count'], 198)
+        self.assertEqual(analysis['line_count'], 15)
+        self.assertEqual(analysis['keywords'], ['docker', 'https', 'com', '方法', '配置'])
+        self.assertTrue(analysis['has_code'])
+        self.assertEqual(analysis['code_blocks'], [
+            {'language': 'bash', 'line_count': 3, 'char_count': 61, 'has_complexity': False}
+        ])
+        self.assertEqual(analysis['headings'], [
+            {'level': 2, 'text': '方法', 'keywords': ['方法']},
+            {'level': 3, 'text': '小结', 'keywords': ['小结']}
+        ])
+        self.assertTrue(analysis['has_headings'])
+        self.assertTrue(analysis['has_lists'])
+        self.assertEqual(analysis['links'], [('文档', 'https://docs.docker.com'), ('指南', 'https://example.com')])
+        self.assertEqual(analysis['estimated_read_time'], '1分钟')
+    
+    def test_analyze_content_ignores_markup_inside_code(self):
+        """测试代码块中的注释行不识别为标题，也不参与关键词提取"""
+        content = "示例：\n```python\n# 注释\nimport os\nprint(os.getcwd())\n```\n结束"
+        
+        analysis = self.builder._analyze_content(content, 'ai')
+        
+        self.assertEqual(analysis['headings'], [])
+        self.assertFalse(analysis['has_headings'])
+        self.assertEqual(analysis['keywords'], ['示例', '结束'])
+        self.assertEqual(analysis['code_blocks'], [
+            {'language': 'python', 'line_count': 4, 'char_count': 34, 'has_complexity': False}
+        ])
+    
+    def test_analyze_content_unclosed_code_block(self):
+        """测试未闭合的代码块按普通文本处理"""
+        content = "开始\n```python\n# 标题\nx = 1"
+        
+        analysis = self.builder._analyze_content(content, 'ai')
+        
+        self.assertFalse(analysis['has_code'])
+        self.assertEqual(analysis['headings'], [{'level': 1, 'text': '标题', 'keywords': ['标题']}])
+        self.assertEqual(analysis['keywords'], ['开始', 'python', '标题'])
+        self.assertEqual(analysis['word_count'], 7)
+    
+    def test_analyze_content_empty(self):
+        """测试空内容返回空分析结果"""
+        self.assertEqual(self.builder._analyze_content('', 'ai'), {})
+    
+    def test_keyword_cache_only_short_text(self):
+        """测试只缓存短文本的关键词，长文本直接提取"""
+        conversation_builder._extract_keywords_cached.cache_clear()
+        long_text = 'docker 网络 ' * conversation_builder._KEYWORD_CACHE_MAX_LENGTH
+        
+        self.assertEqual(self.builder._extract_keywords_from_text(long_text), ['docker', '网络'])
+        self.assertEqual(conversation_builder._extract_keywords_cached.cache_info().currsize, 0)
+        
+        self.assertEqual(self.builder._extract_keywords_from_text('docker 网络'), ['docker', '网络'])
+        self.assertEqual(conversation_builder._extract_keywords_cached.cache_info().currsize, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+tests/test_file_ops.py
+测试文件操作工具函数
+"""
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.file_ops import FileOperations
+
+
+class TestFileOperations(unittest.TestCase):
+    """测试文件操作类"""
+    
+    def setUp(self):
+        """测试前准备：创建临时目录"""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp_dir.name)
+    
+    def test_find_files_skips_dangling_symlink(self):
+        """测试扫描时跳过失效的符号链接，不中断整个扫描"""
+        (self.root / 'sub').mkdir()
+        good = self.root / 'sub' / 'a.html'
+        good.write_text('<html></html>', encoding='utf-8')
+        dangling = self.root / 'b.html'
+        try:
+            os.symlink(self.root / 'missing.html', dangling)
+        except (OSError, NotImplementedError):
+            self.skipTest("当前系统不支持创建符号链接")
+        
+        self.assertEqual(FileOperations.find_files(str(self.root)), [str(good)])
+        self.assertEqual(FileOperations.find_files_with_sizes(str(self.root)), [(str(good), 13)])
+    
+    def test_load_config_reloads_edited_file(self):
+        """测试配置文件修改后重新加载"""
+        config_file = self.root / 'config.yaml'
+        config_file.write_text("batch:\n  workers: 1\n", encoding='utf-8')
+        self.assertEqual(FileOperations.load_config(str(config_file))['batch']['workers'], 1)
+        
+        config_file.write_text("batch:\n  workers: 4\n", encoding='utf-8')
+        # 确保修改时间变化（部分文件系统的时间精度较低）
+        st = os.stat(config_file)
+        os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        
+        self.assertEqual(FileOperations.load_config(str(config_file))['batch']['workers'], 4)
+    
+    def test_load_config_returns_independent_copies(self):
+        """测试调用方修改返回的配置不会影响缓存"""
+        config_file = self.root / 'config.yaml'
+        config_file.write_text("paths:\n  input_dir: ./in\nbatch:\n  markers: [a]\n", encoding='utf-8')
+        
+        config = FileOperations.load_config(str(config_file))
+        config['paths']['input_dir'] = './changed'
+        config['batch']['markers'].append('b')
+        config['extra'] = True
+        
+        reloaded = FileOperations.load_config(str(config_file))
+        self.assertEqual(reloaded, {'paths': {'input_dir': './in'}, 'batch': {'markers': ['a']}})
+    
+    def test_reserve_unique_file_skips_existing_names(self):
+        """测试已存在的文件名依次加序号，且不覆盖已有文件"""
+        (self.root / 'V001_a.md').write_text('旧内容', encoding='utf-8')
+        (self.root / 'V001_a_1.md').write_text('旧内容', encoding='utf-8')
+        
+        file_path = FileOperations.reserve_unique_file(str(self.root), 'V001_a')
+        
+        self.assertEqual(file_path, str(self.root / 'V001_a_2.md'))
+        self.assertEqual(os.path.getsize(file_path), 0)
+        self.assertEqual((self.root / 'V001_a.md').read_text(encoding='utf-8'), '旧内容')
+    
+    def test_reserve_unique_file_concurrent(self):
+        """测试同时为同一基础名预留文件时不会选中同一文件名"""
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            paths = list(executor.map(
+                lambda _: FileOperations.reserve_unique_file(str(self.root), 'V001_a'), range(32)
+            ))
+        
+        self.assertEqual(len(set(paths)), 32)
+        self.assertEqual(len(os.listdir(self.root)), 32)
+    
+    def test_write_chunks_returns_byte_count(self):
+        """测试逐段写入的内容与返回的字节数（含多字节字符）"""
+        chunks = ['# 标题\n', '\n', 'print("你好")\n', 'end']
+        file_path = self.root / 'out' / 'a.md'
+        
+        written = FileOperations.write_chunks(str(file_path), iter(chunks))
+        
+        # 返回值为实际写入磁盘的字节数（Windows下换行符会转换为\r\n）
+        self.assertEqual(written, os.path.getsize(file_path))
+        self.assertGreater(written, len(''.join(chunks)))
+        self.assertEqual(file_path.read_text(encoding='utf-8'), ''.join(chunks))
+    
+    def tearDown(self):
+        """测试后清理临时目录"""
+        self._tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
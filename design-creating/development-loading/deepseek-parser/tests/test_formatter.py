@@ -6,11 +6,13 @@ import os
 import sys
 import unittest
 from pathlib import Path
+from unittest import mock
 
 # 添加项目根目录到Python路径
 sys.path.append(str(Path(__file__).parent.parent))
 
-from core.content_formatter import ContentFormatter
+from core.content_formatter import FORMAT_CACHE_SIZE, ContentFormatter
+from core.conversation_builder import ConversationBuilder
 
 
 class TestContentFormatter(unittest.TestCase):
@@ -166,6 +168,31 @@ class TestContentFormatter(unittest.TestCase):
         
         self.assertLessEqual(max_consecutive, 2)
     
+    def test_format_cache_is_bounded(self):
+        """测试格式化缓存有上限，并保留最近使用的结果"""
+        first = self.formatter.format_content("<p>第0段</p>")
+        for i in range(1, FORMAT_CACHE_SIZE + 10):
+            self.formatter.format_content(f"<p>第{i}段</p>")
+            # 持续使用的内容不会被淘汰
+            self.assertIs(self.formatter.format_content("<p>第0段</p>"), first)
+        
+        self.assertLessEqual(len(self.formatter._format_cache), FORMAT_CACHE_SIZE)
+        self.assertNotIn(("<p>第1段</p>", 'ai'), self.formatter._format_cache)
+    
+    def test_format_cache_cleared_when_build_fails(self):
+        """测试对话构建失败时同样释放格式化缓存"""
+        builder = ConversationBuilder()
+        parsed_data = {'rounds': [{
+            'user': {'content': '如何配置 Docker 网络？'},
+            'ai': {'content': '<p>使用 docker network create 创建网络。</p>'}
+        }]}
+        
+        with mock.patch.object(builder, '_extract_dialog_keywords', side_effect=RuntimeError("失败")):
+            with self.assertRaises(RuntimeError):
+                builder.build(parsed_data, formatter=self.formatter)
+        
+        self.assertEqual(len(self.formatter._format_cache), 0)
+    
     def tearDown(self):
         """测试后清理"""
         pass
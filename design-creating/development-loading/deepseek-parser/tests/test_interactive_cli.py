@@ -0,0 +1,143 @@
+"""
+tests/test_interactive_cli.py
+测试交互式命令行
+"""
+import cProfile
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+import interactive_cli
+from interactive_cli import ADMISSION_HEAD_BYTES, EnhancedInteractiveCLI
+
+
+class TestInteractiveCLI(unittest.TestCase):
+    """测试交互式命令行"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self._tmp_dir.name, 'chat.html')
+    
+    def _write(self, content: bytes) -> int:
+        """写入测试文件，返回字节数"""
+        with open(self.file_path, 'wb') as f:
+            f.write(content)
+        return len(content)
+    
+    def test_module_defines_all_called_helpers(self):
+        """测试CLI引用的辅助方法都已定义"""
+        import re
+        source = Path(interactive_cli.__file__).read_text(encoding='utf-8')
+        for name in set(re.findall(r'self\.(_[a-z]\w*)\b', source)):
+            self.assertTrue(hasattr(EnhancedInteractiveCLI, name), name)
+    
+    def test_admission_min_bytes(self):
+        """测试预筛选排除小于下限的文件"""
+        size = self._write(b'<html>deepseek</html>')
+        self.assertFalse(EnhancedInteractiveCLI._passes_admission(self.file_path, size, size + 1, []))
+        self.assertTrue(EnhancedInteractiveCLI._passes_admission(self.file_path, size, size, []))
+    
+    def test_admission_markers_case_insensitive(self):
+        """测试预筛选在文件头中查找标记时不区分大小写"""
+        size = self._write(b'<html><div class="DeepSeek-Chat">hi</div></html>')
+        self.assertTrue(EnhancedInteractiveCLI._passes_admission(self.file_path, size, 0, [b'deepseek']))
+        self.assertFalse(EnhancedInteractiveCLI._passes_admission(self.file_path, size, 0, [b'chatgpt']))
+    
+    def test_admission_only_reads_head(self):
+        """测试预筛选只在文件头范围内查找标记"""
+        size = self._write(b' ' * ADMISSION_HEAD_BYTES + b'deepseek')
+        self.assertFalse(EnhancedInteractiveCLI._passes_admission(self.file_path, size, 0, [b'deepseek']))
+    
+    def test_admission_admits_unreadable_file(self):
+        """测试读取失败的文件通过预筛选，由后续流程记录错误"""
+        missing = os.path.join(self._tmp_dir.name, 'missing.html')
+        self.assertTrue(EnhancedInteractiveCLI._passes_admission(missing, 100, 0, [b'deepseek']))
+    
+    def test_details_kept_in_full_without_details_file(self):
+        """测试没有明细文件时（测试模式）保留全部明细"""
+        results = EnhancedInteractiveCLI._new_batch_results(300, 0, None)
+        for i in range(300):
+            results['details'].append({'file': f'{i}.html'})
+        
+        self.assertEqual(len(results['details']), 300)
+    
+    def test_details_bounded_with_details_file(self):
+        """测试有明细文件时内存中只保留最近的明细"""
+        results = EnhancedInteractiveCLI._new_batch_results(300, 0, 'batch.jsonl')
+        for i in range(300):
+            results['details'].append({'file': f'{i}.html'})
+        
+        self.assertEqual(len(results['details']), interactive_cli.BATCH_RECENT_DETAILS)
+        self.assertEqual(results['details'][-1], {'file': '299.html'})
+    
+    def test_details_written_as_each_file_finishes(self):
+        """测试每条明细在记录时即写入文件（无需关闭写入流）"""
+        cli = EnhancedInteractiveCLI.__new__(EnhancedInteractiveCLI)
+        cli.session_id = 'test'
+        _, details_file, details_stream = cli._open_batch_details(self._tmp_dir.name)
+        try:
+            results = EnhancedInteractiveCLI._new_batch_results(2, 0, details_file)
+            manifest = {}
+            file_keys = {'a.html': [1, 2]}
+            EnhancedInteractiveCLI._record_batch_result(
+                results, 'a.html', {'file': 'a.html', 'success': True, 'output_file': 'a.md'},
+                details_stream, manifest, file_keys)
+            
+            with open(details_file, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+            self.assertEqual(len(lines), 1)
+            self.assertEqual(json.loads(lines[0])['file'], 'a.html')
+            self.assertEqual(results['success'], 1)
+        finally:
+            details_stream.close()
+    
+    def test_details_file_per_batch(self):
+        """测试同一会话再次批量处理时不覆盖之前的明细文件"""
+        cli = EnhancedInteractiveCLI.__new__(EnhancedInteractiveCLI)
+        cli.session_id = 'test'
+        
+        first_id, first_file, first_stream = cli._open_batch_details(self._tmp_dir.name)
+        first_stream.write('{"file": "a.html"}\n')
+        first_stream.close()
+        second_id, second_file, second_stream = cli._open_batch_details(self._tmp_dir.name)
+        second_stream.close()
+        
+        self.assertEqual(first_id, 'test')
+        self.assertEqual(second_id, 'test_1')
+        self.assertEqual(os.path.basename(second_file), 'batch_test_1.jsonl')
+        with open(first_file, encoding='utf-8') as f:
+            self.assertEqual(f.read(), '{"file": "a.html"}\n')
+    
+    def test_profile_file_per_batch(self):
+        """测试性能数据文件与明细文件同名，再次批量处理时不覆盖"""
+        cli = EnhancedInteractiveCLI.__new__(EnhancedInteractiveCLI)
+        cli.session_id = 'test'
+        cli.logger = logging.getLogger(__name__)
+        
+        profile_files = []
+        for _ in range(2):
+            batch_id, details_file, details_stream = cli._open_batch_details(self._tmp_dir.name)
+            details_stream.close()
+            profiler = cProfile.Profile()
+            profiler.enable()
+            profile_files.append(cli._dump_batch_profile(profiler, self._tmp_dir.name, batch_id))
+            self.assertEqual(os.path.splitext(profile_files[-1])[0], os.path.splitext(details_file)[0])
+        
+        self.assertEqual([os.path.basename(f) for f in profile_files], ['batch_test.prof', 'batch_test_1.prof'])
+        self.assertTrue(all(os.path.exists(f) for f in profile_files))
+    
+    def tearDown(self):
+        """测试后清理"""
+        self._tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+tests/test_logger.py
+测试日志记录模块
+"""
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.logger import ColorFormatter, ParserLogger, get_logger
+
+
+class TestParserLogger(unittest.TestCase):
+    """测试解析器日志记录器"""
+    
+    def setUp(self):
+        """测试前准备：日志文件写到临时目录"""
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self._tmp_dir.name, 'logs', 'test.log')
+        self.config = {'logging': {'level': 'DEBUG', 'file': self.log_file}}
+    
+    def _read_log(self):
+        """等后台队列写完后读取日志文件"""
+        ParserLogger._queue.join()
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    def test_log_file_has_no_color_codes(self):
+        """测试控制台的颜色代码不会写入日志文件"""
+        parser_logger = get_logger(self.config)
+        parser_logger.warning("警告 %s", "内容")
+        parser_logger.error("错误")  # ERROR级别会刷新文件缓冲
+        
+        content = self._read_log()
+        self.assertIn("WARNING - 警告 内容", content)
+        self.assertIn("ERROR - 错误", content)
+        self.assertNotIn('\x1b', content)
+    
+    def test_listener_started_once(self):
+        """测试重复创建日志记录器不会重启后台监听器或重建文件处理器"""
+        get_logger(self.config)
+        listener = ParserLogger._listener
+        handlers = listener.handlers
+        
+        get_logger(self.config)
+        
+        self.assertIs(ParserLogger._listener, listener)
+        self.assertIs(listener.handlers, handlers)
+        self.assertEqual(len(logging.getLogger('deepseek_parser').handlers), 2)
+    
+    def test_color_formatter_keeps_record(self):
+        """测试彩色格式化不修改原日志记录"""
+        record = logging.LogRecord('deepseek_parser', logging.INFO, __file__, 1, "消息", None, None)
+        
+        formatted = ColorFormatter('%(levelname)s - %(message)s').format(record)
+        
+        self.assertIn('\x1b', formatted)
+        self.assertEqual(record.levelname, 'INFO')
+        self.assertEqual(record.msg, "消息")
+    
+    def tearDown(self):
+        """测试后恢复默认日志配置并清理临时目录"""
+        get_logger()
+        self._tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
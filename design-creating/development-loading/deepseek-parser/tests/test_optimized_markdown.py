@@ -0,0 +1,53 @@
+"""
+tests/test_optimized_markdown.py
+测试优化Markdown输出
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.append(str(Path(__file__).parent.parent))
+
+from outputs.optimized_markdown import OptimizedMarkdownWriter
+
+
+class TestOptimizedMarkdownWriter(unittest.TestCase):
+    """测试优化Markdown写入器"""
+    
+    def setUp(self):
+        """测试前准备"""
+        self.writer = OptimizedMarkdownWriter()
+    
+    def test_format_timestamp_matches_previous_results(self):
+        """测试时间戳格式化与逐个解析的实现结果一致"""
+        # 期望值来自增加直接截取之前（全部用fromisoformat解析）的实现
+        cases = {
+            '': '',
+            '2024-01-24T10:00:00': '2024-01-24 10:00',
+            '2024-01-24T10:00': '2024-01-24 10:00',
+            '2024-01-24T10:00:00.123': '2024-01-24 10:00',
+            '2024-01-24T10:00:00.123456Z': '2024-01-24 10:00',
+            '2024-01-24T23:59:59+08:00': '2024-01-24 23:59',
+            '2024-01-24T10:00:00-05:30': '2024-01-24 10:00',
+            # 29~31日
+            '2024-01-31T23:59:59Z': '2024-01-31 23:59',
+            '2024-02-29T10:00:00': '2024-02-29 10:00',
+            '2024-12-30T08:15': '2024-12-30 08:15',
+            # 不存在的日期和无法解析的内容原样返回
+            '2023-02-29T10:00:00': '2023-02-29T10:00:00',
+            '2024-04-31T00:00': '2024-04-31T00:00',
+            '0000-01-01T00:00': '0000-01-01T00:00',
+            '2024-13-01T00:00': '2024-13-01T00:00',
+            '2024-01-24T24:00': '2024-01-24T24:00',
+            'not-a-timeTstamp': 'not-a-timeTstamp',
+            # 其他ISO形式交给fromisoformat
+            '2024-01-24T10:00:00+0800': '2024-01-24 10:00',
+            '2024-01-24 10:00:00': '2024-01-24 10:00:00',
+        }
+        for timestamp, expected in cases.items():
+            self.assertEqual(self.writer._format_timestamp(timestamp), expected, timestamp)
+
+
+if __name__ == '__main__':
+    unittest.main()
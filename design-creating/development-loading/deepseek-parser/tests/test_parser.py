@@ -4,25 +4,34 @@ tests/test_parser.py
 """
 import os
 import sys
+import tempfile
 import unittest
 from pathlib import Path
 
 # 添加项目根目录到Python路径
 sys.path.append(str(Path(__file__).parent.parent))
 
-from core.deepseek_parser import DeepSeekParser
+from core import deepseek_parser
+from core.deepseek_parser import (HAS_HTML_TO_MARKDOWN, DeepSeekParser, _TECHNICAL_INDICATORS,
+                                  _has_technical_indicator, _markdown_text)
 
 
 class TestDeepSeekParser(unittest.TestCase):
     """测试DeepSeek解析器"""
     
-    def setUp(self):
-        """测试前准备"""
-        self.parser = DeepSeekParser()
-        
-        # 测试数据目录
-        self.test_data_dir = Path(__file__).parent.parent / "test_data"
-        self.test_data_dir.mkdir(exist_ok=True)
+    @classmethod
+    def setUpClass(cls):
+        """测试前准备（解析器按实际用法在各测试间复用）"""
+        cls.parser = DeepSeekParser()
+        
+        # 测试数据目录（整个测试类共用一个临时目录）
+        cls._tmp_dir = tempfile.TemporaryDirectory()
+        cls.test_data_dir = Path(cls._tmp_dir.name)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """测试后清理临时目录"""
+        cls._tmp_dir.cleanup()
     
     def test_parse_simple_html(self):
         """测试解析简单HTML"""
@@ -109,6 +118,34 @@ class TestDeepSeekParser(unittest.TestCase):
         ai_code = "```python\ndef hello():\n    return 'Hello World'\n```"
         self.assertTrue(self.parser._is_technical_conversation(user_code, ai_code))
     
+    def test_technical_indicators(self):
+        """测试技术指标匹配（代码块快速路径、不区分大小写）"""
+        # 代码块标记直接判定为技术内容
+        self.assertTrue(_has_technical_indicator("```"))
+        self.assertTrue(_has_technical_indicator("见下文\n```\nx = 1\n```"))
+        
+        # 每个指标单独出现都能命中，英文指标不区分大小写
+        for indicator in _TECHNICAL_INDICATORS:
+            self.assertTrue(_has_technical_indicator(f"回答：{indicator}"), indicator)
+            self.assertTrue(_has_technical_indicator(f"回答：{indicator.upper()}"), indicator)
+        self.assertTrue(_has_technical_indicator("使用 Kubernetes 和 Docker"))
+        
+        # 没有任何指标
+        self.assertFalse(_has_technical_indicator("今天天气不错。"))
+        self.assertFalse(_has_technical_indicator("``"))
+    
+    def test_exclusion_cache_only_short_questions(self):
+        """测试只缓存短问题的排除判断结果，长问题直接判断"""
+        deepseek_parser._match_exclusion_cached.cache_clear()
+        long_question = '哈哈' + '如何配置Docker？' * deepseek_parser._EXCLUSION_CACHE_MAX_LENGTH
+        
+        self.assertTrue(self.parser._is_excluded_question(long_question))
+        self.assertEqual(deepseek_parser._match_exclusion_cached.cache_info().currsize, 0)
+        
+        self.assertTrue(self.parser._is_excluded_question('你好'))
+        self.assertFalse(self.parser._is_excluded_question('如何配置Docker？'))
+        self.assertEqual(deepseek_parser._match_exclusion_cached.cache_info().currsize, 2)
+    
     def test_extract_content(self):
         """测试内容提取"""
         # 创建测试元素
@@ -143,6 +180,53 @@ class TestDeepSeekParser(unittest.TestCase):
         timestamp = self.parser._extract_timestamp(element)
         self.assertEqual(timestamp, "2024-01-24T11:00:00")
     
+    def test_identify_structure(self):
+        """测试按原始HTML中的标记识别结构"""
+        from bs4 import BeautifulSoup
+        
+        samples = {
+            'new_version': '<div class="deepseek-chat-container"><p>内容</p></div>',
+            'old_version': '<div class="chat-container legacy"><p>内容</p></div>',
+            'mobile_version': '<html><head><meta name="Viewport" content="width=device-width"></head>'
+                              '<body><p>内容</p></body></html>',
+            'generic': '<div><p>你好，世界</p></div>',
+        }
+        for expected, html in samples.items():
+            soup = BeautifulSoup(html, 'lxml')
+            self.assertEqual(self.parser._identify_structure(soup, html), expected)
+            # 未传入原始HTML时使用解析树的文本
+            self.assertEqual(self.parser._identify_structure(soup), expected)
+    
+    def test_markdown_backend_selection(self):
+        """测试HTML转Markdown后端的选择（未安装html-to-markdown时回退到html2text）"""
+        parser = DeepSeekParser({'parsing': {'markdown_backend': 'html2text'}})
+        self.assertFalse(parser.use_html_to_markdown)
+        
+        parser = DeepSeekParser({'parsing': {'markdown_backend': 'auto'}})
+        self.assertEqual(parser.use_html_to_markdown, HAS_HTML_TO_MARKDOWN)
+        
+        content = parser._extract_content_from_html('<div><h2>标题</h2><p>这是<b>测试</b>内容</p></div>')
+        self.assertIn('## 标题', content)
+        self.assertIn('**测试**', content)
+    
+    @unittest.skipUnless(HAS_HTML_TO_MARKDOWN, "未安装html-to-markdown")
+    def test_html_to_markdown_backend(self):
+        """测试html-to-markdown后端的转换结果"""
+        parser = DeepSeekParser({'parsing': {'markdown_backend': 'html-to-markdown'}})
+        self.assertTrue(parser.use_html_to_markdown)
+        
+        content = parser._extract_content_from_html('<div><h2>标题</h2><p>这是<b>测试</b>内容</p></div>')
+        self.assertIn('## 标题', content)
+        self.assertIn('**测试**', content)
+    
+    def test_markdown_text_accepts_str_and_result(self):
+        """测试html-to-markdown转换结果为str或结果对象时都能取出文本"""
+        class Result:
+            content = "## 标题"
+        
+        self.assertEqual(_markdown_text("## 标题"), "## 标题")
+        self.assertEqual(_markdown_text(Result()), "## 标题")
+    
     def tearDown(self):
         """测试后清理"""
         pass
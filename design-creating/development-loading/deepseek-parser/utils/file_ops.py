@@ -2,6 +2,7 @@
 utils/file_ops.py
 文件操作工具函数
 """
+import copy
 import os
 import shutil
 import json
@@ -10,6 +11,9 @@ from datetime import datetime
 from pathlib import Path
 import hashlib
 
+# 已加载的配置缓存：(绝对路径, 修改时间) -> 解析结果
+_config_cache = {}
+
 
 class FileOperations:
     """文件操作类"""
@@ -30,18 +34,32 @@ class FileOperations:
     @staticmethod
     def read_file(file_path, encoding='utf-8'):
         """读取文件内容"""
+        # 只读一次磁盘，解码失败时用同一份字节尝试其他编码
+        data = FileOperations.read_bytes(file_path)
         try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                return f.read()
+            text = data.decode(encoding)
         except UnicodeDecodeError:
             # 尝试其他编码
             try:
-                with open(file_path, 'r', encoding='gbk') as f:
-                    return f.read()
+                text = data.decode('gbk')
             except Exception as e:
                 raise Exception(f"无法读取文件 {file_path}: {e}")
         except Exception as e:
             raise Exception(f"无法读取文件 {file_path}: {e}")
+        
+        # 与文本模式读取一致：统一换行符为\n
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+    
+    @staticmethod
+    def read_bytes(file_path):
+        """读取文件的原始字节（不解码）"""
+        try:
+            with open(file_path, 'rb') as f:
+                return f.read()
+        except Exception as e:
+            raise Exception(f"无法读取文件 {file_path}: {e}")
     
     @staticmethod
     def write_file(file_path, content, encoding='utf-8'):
@@ -58,27 +76,66 @@ class FileOperations:
         except Exception as e:
             raise Exception(f"写入文件失败 {file_path}: {e}")
     
+    @staticmethod
+    def write_chunks(file_path, chunks, encoding='utf-8', buffering=1 << 20):
+        """逐段写入文件内容（不在内存中拼接完整内容），返回写入的字节数"""
+        try:
+            # 确保目录存在
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            
+            with open(file_path, 'w', encoding=encoding, buffering=buffering) as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                # 文本模式的 tell() 是不透明的位置标记，不一定等于字节数；刷新后取文件实际大小
+                f.flush()
+                return os.fstat(f.fileno()).st_size
+        except Exception as e:
+            raise Exception(f"写入文件失败 {file_path}: {e}")
+    
     @staticmethod
     def find_files(directory, extensions=None, recursive=True):
         """查找指定扩展名的文件"""
         if not os.path.exists(directory):
             return []
         
-        extensions = extensions or ['.html', '.htm']
-        files = []
-        
-        if recursive:
-            for root, _, filenames in os.walk(directory):
-                for filename in filenames:
-                    if any(filename.lower().endswith(ext) for ext in extensions):
-                        files.append(os.path.join(root, filename))
-        else:
-            for filename in os.listdir(directory):
-                if any(filename.lower().endswith(ext) for ext in extensions):
-                    files.append(os.path.join(directory, filename))
+        extensions = tuple(extensions or ['.html', '.htm'])
+        return sorted(entry.path for entry in FileOperations._scan_files(directory, extensions, recursive))
+    
+    @staticmethod
+    def find_files_with_sizes(directory, extensions=None, recursive=True):
+        """查找指定扩展名的文件，返回按路径排序的 (文件路径, 文件大小) 列表"""
+        if not os.path.exists(directory):
+            return []
         
+        extensions = tuple(extensions or ['.html', '.htm'])
+        files = []
+        for entry in FileOperations._scan_files(directory, extensions, recursive):
+            try:
+                files.append((entry.path, entry.stat().st_size))
+            except OSError as e:
+                # 扫描期间文件被删除等情况，跳过该文件
+                print(f"跳过无法读取的文件 {entry.path}: {e}")
         return sorted(files)
     
+    @staticmethod
+    def _scan_files(directory, extensions, recursive):
+        """用os.scandir遍历目录，逐个返回扩展名匹配的文件条目（不进入符号链接目录，跳过失效的链接）"""
+        with os.scandir(directory) as entries:
+            subdirs = []
+            for entry in entries:
+                if entry.is_dir():
+                    if recursive and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.lower().endswith(extensions):
+                    if entry.is_file():
+                        yield entry
+                    else:
+                        print(f"跳过非普通文件或失效的链接 {entry.path}")
+        for subdir in subdirs:
+            yield from FileOperations._scan_files(subdir, extensions, recursive)
+    
     @staticmethod
     def get_file_hash(file_path):
         """获取文件哈希值（用于检测文件变化）"""
@@ -90,10 +147,21 @@ class FileOperations:
     
     @staticmethod
     def load_config(config_path):
-        """加载YAML配置文件"""
+        """
+        加载YAML配置文件
+        
+        按文件路径和修改时间缓存解析结果，文件未变化时不再重新解析；
+        返回深拷贝，调用方修改配置不会影响缓存。
+        """
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+            abs_path = os.path.abspath(config_path)
+            cache_key = (abs_path, os.stat(abs_path).st_mtime_ns)
+            if cache_key not in _config_cache:
+                with open(abs_path, 'r', encoding='utf-8') as f:
+                    config = yaml.safe_load(f)
+                _config_cache.clear()
+                _config_cache[cache_key] = config
+            return copy.deepcopy(_config_cache[cache_key])
         except Exception as e:
             print(f"加载配置文件失败 {config_path}: {e}")
             # 返回默认配置
@@ -148,14 +216,19 @@ class FileOperations:
         return safe_name
     
     @staticmethod
-    def generate_output_filename(conversation_data, base_dir, extension='.md'):
-        """根据对话数据生成输出文件名"""
+    def get_output_basename(conversation_data):
+        """根据对话数据生成输出文件的基础名（不含扩展名和去重后缀）"""
         dialog_id = conversation_data.get('metadata', {}).get('dialog_id', 'unknown')
         title_keywords = conversation_data.get('metadata', {}).get('title_keywords', 'conversation')
         
-        # 生成文件名
         safe_keywords = FileOperations.get_safe_filename(title_keywords, 50)
-        filename = f"{dialog_id}_{safe_keywords}{extension}"
+        return f"{dialog_id}_{safe_keywords}"
+    
+    @staticmethod
+    def generate_output_filename(conversation_data, base_dir, extension='.md'):
+        """根据对话数据生成输出文件名"""
+        # 生成文件名
+        filename = FileOperations.get_output_basename(conversation_data) + extension
         
         # 确保不重名
         counter = 1
@@ -165,4 +238,24 @@ class FileOperations:
             filename = f"{name}_{counter}{ext}"
             counter += 1
         
-        return filename
\ No newline at end of file
+        return filename
+    
+    @staticmethod
+    def reserve_unique_file(directory, base_name, extension='.md'):
+        """
+        以独占方式创建不重名的空文件并返回其路径
+        
+        依次尝试 base_name、base_name_1、base_name_2 ...，文件已存在时换下一个名字。
+        创建由操作系统保证原子性，多个进程同时生成输出时不会选中同一文件名。
+        """
+        counter = 0
+        while True:
+            suffix = f"_{counter}" if counter else ""
+            file_path = os.path.join(directory, f"{base_name}{suffix}{extension}")
+            try:
+                fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                counter += 1
+                continue
+            os.close(fd)
+            return file_path
@@ -2,15 +2,30 @@
 utils/logger.py
 日志记录模块
 """
+import atexit
+import copy
 import logging
+import queue
 import sys
 import os
+import time
 from datetime import datetime
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 from colorama import init, Fore, Style
 
 # 初始化colorama
 init(autoreset=True)
 
+# 进度条长度及预先生成的全部进度条字符串（0~满格）
+PROGRESS_BAR_LENGTH = 30
+_PROGRESS_BARS = [
+    '[' + '█' * i + '░' * (PROGRESS_BAR_LENGTH - i) + ']'
+    for i in range(PROGRESS_BAR_LENGTH + 1)
+]
+
+# 进度条未变化时的最小刷新间隔（秒）
+PROGRESS_REFRESH_INTERVAL = 0.05
+
 
 class ColorFormatter(logging.Formatter):
     """彩色日志格式化器"""
@@ -24,7 +39,8 @@ class ColorFormatter(logging.Formatter):
     }
     
     def format(self, record):
-        # 添加颜色
+        # 在副本上添加颜色，不修改其他处理器（如日志文件）共用的日志记录
+        record = copy.copy(record)
         color = self.COLORS.get(record.levelname, '')
         record.levelname = f"{color}{record.levelname}{Style.RESET_ALL}"
         record.msg = f"{color}{record.msg}{Style.RESET_ALL}"
@@ -34,47 +50,112 @@ class ColorFormatter(logging.Formatter):
 class ParserLogger:
     """解析器专用日志记录器"""
     
+    # 文件日志的后台队列和监听器（所有实例共享同一个logging.Logger，每个进程只启动一次）
+    _queue = None
+    _listener = None
+    _listener_pid = None
+    # 当前文件处理器对应的 (日志文件, 缓冲条数)
+    _file_config = None
+    
     def __init__(self, config=None):
         self.config = config or {}
         self.logger = logging.getLogger('deepseek_parser')
         self._setup_logger()
+        
+        # 进度输出节流状态
+        self._last_filled = -1
+        self._last_progress_time = 0.0
     
     def _setup_logger(self):
         """配置日志记录器"""
+        logging_config = self.config.get('logging', {})
+        
         # 设置日志级别
-        log_level = self.config.get('logging', {}).get('level', 'INFO')
+        log_level = logging_config.get('level', 'INFO')
         self.logger.setLevel(getattr(logging, log_level))
         
-        # 清除已有的处理器
-        self.logger.handlers.clear()
+        # 本进程首次配置时安装处理器并启动后台监听器
+        # （fork出的子进程继承了父进程的状态，但没有监听线程，需要重新安装）
+        if ParserLogger._listener is None or ParserLogger._listener_pid != os.getpid():
+            self.logger.handlers.clear()
+            
+            # 控制台处理器（同步输出，与进度条和交互输入按顺序显示）
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_formatter = ColorFormatter(
+                '%(asctime)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+            console_handler.setFormatter(console_formatter)
+            self.logger.addHandler(console_handler)
+            
+            # 文件日志通过队列将格式化和I/O移到后台线程，避免阻塞解析流程
+            ParserLogger._queue = queue.Queue(-1)
+            self.logger.addHandler(QueueHandler(ParserLogger._queue))
+            ParserLogger._listener = QueueListener(ParserLogger._queue, respect_handler_level=True)
+            ParserLogger._listener.start()
+            ParserLogger._listener_pid = os.getpid()
+            ParserLogger._file_config = None
+        
+        # 日志文件配置变化时才替换文件处理器
+        file_config = (logging_config.get('file'), logging_config.get('buffer_capacity', 1024))
+        if file_config != ParserLogger._file_config:
+            ParserLogger._replace_file_handlers(self._create_file_handlers(*file_config))
+            ParserLogger._file_config = file_config
+    
+    @staticmethod
+    def _create_file_handlers(log_file, buffer_capacity):
+        """创建文件处理器（未配置日志文件时返回空列表）"""
+        if not log_file:
+            return []
+        
+        # 确保日志目录存在
+        log_dir = os.path.dirname(log_file)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir)
         
-        # 控制台处理器
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_formatter = ColorFormatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
+        file_handler = logging.FileHandler(
+            log_file,
+            encoding='utf-8'
+        )
+        file_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
-        console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
+        file_handler.setFormatter(file_formatter)
         
-        # 文件处理器（如果配置了日志文件）
-        log_file = self.config.get('logging', {}).get('file')
-        if log_file:
-            # 确保日志目录存在
-            log_dir = os.path.dirname(log_file)
-            if log_dir and not os.path.exists(log_dir):
-                os.makedirs(log_dir)
-            
-            file_handler = logging.FileHandler(
-                log_file,
-                encoding='utf-8'
-            )
-            file_formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            file_handler.setFormatter(file_formatter)
-            self.logger.addHandler(file_handler)
+        # 缓冲写入：攒够一批或遇到ERROR及以上级别时才刷到磁盘
+        return [MemoryHandler(
+            buffer_capacity,
+            flushLevel=logging.ERROR,
+            target=file_handler
+        )]
+    
+    @staticmethod
+    def _replace_file_handlers(handlers):
+        """等队列中已有的日志写完后换上新的文件处理器，并关闭旧处理器"""
+        listener = ParserLogger._listener
+        ParserLogger._queue.join()
+        old_handlers = listener.handlers
+        listener.handlers = tuple(handlers)
+        ParserLogger._close_handlers(old_handlers)
+    
+    @staticmethod
+    def _close_handlers(handlers):
+        """关闭处理器（MemoryHandler关闭时会先刷新缓冲区）"""
+        for handler in handlers:
+            target = getattr(handler, 'target', None)
+            handler.close()
+            if target is not None:
+                target.close()
+    
+    @staticmethod
+    def _stop_listener():
+        """停止后台监听器并刷新队列中剩余的日志"""
+        if ParserLogger._listener is not None and ParserLogger._listener_pid == os.getpid():
+            ParserLogger._listener.stop()
+            ParserLogger._close_handlers(ParserLogger._listener.handlers)
+        ParserLogger._listener = None
+        ParserLogger._file_config = None
     
     def debug(self, msg, *args, **kwargs):
         """调试日志"""
@@ -99,15 +180,28 @@ class ParserLogger:
     def progress(self, current, total, msg=""):
         """进度日志"""
         percentage = (current / total) * 100 if total > 0 else 0
-        progress_bar = self._create_progress_bar(percentage)
-        sys.stdout.write(f"\r{progress_bar} {percentage:.1f}% - {msg}")
+        filled_length = min(PROGRESS_BAR_LENGTH, max(0, int(PROGRESS_BAR_LENGTH * percentage // 100)))
+        
+        # 进度条无变化且距上次刷新不久时跳过输出
+        now = time.monotonic()
+        finished = current >= total
+        if (not finished and filled_length == self._last_filled
+                and now - self._last_progress_time < PROGRESS_REFRESH_INTERVAL):
+            return
+        self._last_filled = filled_length
+        self._last_progress_time = now
+        
+        sys.stdout.write(f"\r{_PROGRESS_BARS[filled_length]} {percentage:.1f}% - {msg}")
         sys.stdout.flush()
         
-        if current >= total:
+        if finished:
             print()  # 完成时换行
+            self._last_filled = -1
     
-    def _create_progress_bar(self, percentage, length=30):
+    def _create_progress_bar(self, percentage, length=PROGRESS_BAR_LENGTH):
         """创建进度条"""
+        if length == PROGRESS_BAR_LENGTH:
+            return _PROGRESS_BARS[min(length, max(0, int(length * percentage // 100)))]
         filled_length = int(length * percentage // 100)
         bar = '█' * filled_length + '░' * (length - filled_length)
         return f"[{bar}]"
@@ -119,4 +213,7 @@ def get_logger(config=None):
 
 
 # 全局日志记录器
-logger = get_logger()
\ No newline at end of file
+logger = get_logger()
+
+# 退出时刷新后台日志队列
+atexit.register(ParserLogger._stop_listener)
\ No newline at end of file